@@ -0,0 +1,169 @@
+import os
+import json
+import time
+import uuid
+import asyncio
+import sqlite3
+import threading
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Bulk ingestion: every uploaded document becomes a queued item persisted in
+# SQLite, so a restart picks up whatever was still pending or running.
+BATCH_DB_PATH = os.getenv("BATCH_DB_PATH", "batch_jobs.sqlite3")
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", "4"))
+# Uncompressed size limits for zip uploads, per member and per upload
+BATCH_MAX_DOCUMENT_BYTES = int(os.getenv("BATCH_MAX_DOCUMENT_BYTES", str(20 * 1024 * 1024)))
+BATCH_MAX_UPLOAD_BYTES = int(os.getenv("BATCH_MAX_UPLOAD_BYTES", str(200 * 1024 * 1024)))
+
+
+class BatchQueue:
+    # processor(kind, filename, content) -> dict does the actual parsing
+    def __init__(self, path: str, workers: int, processor):
+        self.workers = workers
+        self.processor = processor
+        self._queue = None
+        self._tasks = []
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS batch_jobs ("
+            "id TEXT PRIMARY KEY, kind TEXT NOT NULL, created_at REAL NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS batch_items ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, job_id TEXT NOT NULL, "
+            "filename TEXT NOT NULL, content BLOB, status TEXT NOT NULL, "
+            "result TEXT, error TEXT, updated_at REAL NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS batch_items_job ON batch_items (job_id);"
+        )
+        self._db.commit()
+
+    def _execute(self, sql: str, params=()):
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+            self._db.commit()
+        return rows
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        # Anything left running by a previous process is retried from scratch
+        self._execute(
+            "UPDATE batch_items SET status = 'pending', updated_at = ? WHERE status = 'running'",
+            (time.time(),)
+        )
+        for (item_id,) in self._execute("SELECT id FROM batch_items WHERE status = 'pending' ORDER BY id"):
+            self._queue.put_nowait(item_id)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    # The document BLOBs are written off the event loop
+    async def submit(self, kind: str, documents: list) -> str:
+        job_id = uuid.uuid4().hex
+        item_ids = await asyncio.to_thread(self._insert_job, job_id, kind, documents)
+        for item_id in item_ids:
+            self._queue.put_nowait(item_id)
+        return job_id
+
+    def _insert_job(self, job_id: str, kind: str, documents: list) -> list:
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO batch_jobs (id, kind, created_at) VALUES (?, ?, ?)", (job_id, kind, now)
+            )
+            item_ids = [
+                self._db.execute(
+                    "INSERT INTO batch_items (job_id, filename, content, status, updated_at) "
+                    "VALUES (?, ?, ?, 'pending', ?)",
+                    (job_id, filename, content, now)
+                ).lastrowid
+                for filename, content in documents
+            ]
+            self._db.commit()
+        return item_ids
+
+    # Reading the items and decoding every result runs off the event loop
+    async def status(self, job_id: str):
+        return await asyncio.to_thread(self._status, job_id)
+
+    def _status(self, job_id: str):
+        job = self._execute("SELECT kind, created_at FROM batch_jobs WHERE id = ?", (job_id,))
+        if not job:
+            return None
+        items = self._execute(
+            "SELECT filename, status, result, error FROM batch_items WHERE job_id = ? ORDER BY id",
+            (job_id,)
+        )
+        counts = {"pending": 0, "running": 0, "done": 0, "partial": 0, "failed": 0}
+        for _, status, _, _ in items:
+            counts[status] += 1
+        return {
+            "job_id": job_id,
+            "kind": job[0][0],
+            "created_at": job[0][1],
+            "total": len(items),
+            **counts,
+            "progress": (counts["done"] + counts["partial"] + counts["failed"]) / len(items) if items else 1.0,
+            "items": [
+                {
+                    "filename": filename,
+                    "status": status,
+                    "result": json.loads(result) if result else None,
+                    "error": error,
+                }
+                for filename, status, result, error in items
+            ],
+        }
+
+    async def _worker(self):
+        while True:
+            item_id = await self._queue.get()
+            try:
+                await self._process(item_id)
+            finally:
+                self._queue.task_done()
+
+    # SQLite work (the BLOB read and the status updates) runs in a thread
+    async def _process(self, item_id: int):
+        rows = await asyncio.to_thread(
+            self._execute,
+            "SELECT b.kind, i.filename, i.content FROM batch_items i "
+            "JOIN batch_jobs b ON b.id = i.job_id WHERE i.id = ? AND i.status = 'pending'",
+            (item_id,)
+        )
+        if not rows:
+            return
+        kind, filename, content = rows[0]
+        await asyncio.to_thread(
+            self._execute,
+            "UPDATE batch_items SET status = 'running', updated_at = ? WHERE id = ?",
+            (time.time(), item_id)
+        )
+        try:
+            result = await self.processor(kind, filename, content)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await asyncio.to_thread(
+                self._execute,
+                "UPDATE batch_items SET status = 'failed', error = ?, content = NULL, updated_at = ? "
+                "WHERE id = ?",
+                (str(getattr(e, "detail", e)), time.time(), item_id)
+            )
+        else:
+            # A result with per-section "errors" (JD profiles report failed
+            # sections instead of raising) is kept, but marked partial
+            errors = result.get("errors")
+            await asyncio.to_thread(
+                self._execute,
+                "UPDATE batch_items SET status = ?, result = ?, error = ?, content = NULL, updated_at = ? "
+                "WHERE id = ?",
+                ("partial" if errors else "done",
+                 json.dumps(result),
+                 f"sections failed: {', '.join(errors)}" if errors else None,
+                 time.time(), item_id)
+            )
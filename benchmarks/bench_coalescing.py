@@ -0,0 +1,64 @@
+import os
+import json
+import time
+import asyncio
+import argparse
+
+# Offline defaults: fake completion backend, no LLM result cache, so every
+# saved completion below is down to single-flight coalescing alone
+os.environ.setdefault("LLM_BACKEND", "fake")
+os.environ.setdefault("LLM_CACHE_PATH", "")
+os.environ.setdefault("BATCH_DB_PATH", ":memory:")
+
+import httpx
+
+import llm_client
+from benchmarks.corpus import make_resume_text
+
+# Concurrent uploads of the same document (double clicks, two recruiters on one
+# CV) against the in-process app: backend completions per route should match
+# the number of distinct documents, not the number of requests.
+# Run from the repo root:
+#   python -m benchmarks.bench_coalescing --duplicates 20 --distinct 3
+
+ROUTES = ("/parse/design", "/parse/jd/wricef", "/parse/resume/all")
+
+
+async def run(args) -> dict:
+    import resume_parser
+    transport = httpx.ASGITransport(app=resume_parser.app)
+    documents = [make_resume_text(80, seed=seed).encode() for seed in range(args.distinct)]
+    report = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://coalescing", timeout=None) as client:
+        for route in ROUTES:
+            calls_before = llm_client.backend.calls
+            began = time.perf_counter()
+            responses = await asyncio.gather(*(
+                client.post(route, files={"file": ("cv.txt", documents[index % args.distinct])})
+                for index in range(args.duplicates * args.distinct)
+            ))
+            report[route] = {
+                "requests": len(responses),
+                "errors": sum(1 for resp in responses if resp.status_code != 200),
+                "backend_calls": llm_client.backend.calls - calls_before,
+                "elapsed_ms": round(1000 * (time.perf_counter() - began), 1),
+            }
+            print(f"{route:<22} {report[route]['requests']:>4} requests -> "
+                  f"{report[route]['backend_calls']:>3} completions")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--duplicates", type=int, default=20, help="concurrent uploads of each document")
+    parser.add_argument("--distinct", type=int, default=3)
+    parser.add_argument("--output", default="bench_coalescing.json")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import os
+import json
+import asyncio
+import argparse
+
+# Offline defaults: fake completion backend with no latency and no LLM result
+# cache, so every profile pays for its own completions
+os.environ.setdefault("LLM_BACKEND", "fake")
+os.environ.setdefault("FAKE_LLM_LATENCY_MS", "0")
+os.environ.setdefault("LLM_CACHE_PATH", "")
+os.environ.setdefault("BATCH_DB_PATH", ":memory:")
+
+import llm_client
+from resume_parser import parse_resume_profile
+from jd_parser import parse_jd_profile
+from benchmarks.corpus import make_resume_text
+
+# Total tokens for a full résumé profile (/parse/resume/all) and a full JD
+# profile (/parse/jd/all) in split vs combined mode, as reported in the fake
+# backend's usage (prompt tokens counted with token_budget). Run from the repo root:
+#   python -m benchmarks.bench_combined --docs 20 --lines 300
+
+PROFILES = {"resume": parse_resume_profile, "jd": parse_jd_profile}
+
+
+def usage_snapshot() -> dict:
+    return {kind: sum(totals[kind] for totals in llm_client.token_usage.values())
+            for kind in ("calls", "prompt_tokens", "completion_tokens", "total_tokens")}
+
+
+# Mean calls and tokens per document for one profile and mode
+async def measure(parse, corpus: list, mode: str) -> dict:
+    before = usage_snapshot()
+    for text in corpus:
+        await parse(text, mode)
+    after = usage_snapshot()
+    return {kind: round((after[kind] - before[kind]) / len(corpus), 1) for kind in after}
+
+
+async def run(args) -> dict:
+    profiles = {}
+    for name, parse in PROFILES.items():
+        # distinct documents per mode, so single-flight coalescing never shares a completion
+        split = await measure(parse, [make_resume_text(args.lines, seed=i) for i in range(args.docs)], "split")
+        combined = await measure(
+            parse, [make_resume_text(args.lines, seed=args.docs + i) for i in range(args.docs)], "combined"
+        )
+        profiles[name] = {
+            "split": split,
+            "combined": combined,
+            "total_token_reduction": round(1 - combined["total_tokens"] / split["total_tokens"], 4),
+        }
+        print(f"{name:<7} per document: split {split['total_tokens']:>9} tokens in {split['calls']:>4} calls, "
+              f"combined {combined['total_tokens']:>9} tokens in {combined['calls']:>4} calls "
+              f"({profiles[name]['total_token_reduction']:.1%} fewer)")
+    return profiles
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=20)
+    parser.add_argument("--lines", type=int, default=300)
+    parser.add_argument("--output", default="bench_combined.json")
+    args = parser.parse_args()
+
+    report = {"docs": args.docs, "lines": args.lines, "profiles": asyncio.run(run(args))}
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
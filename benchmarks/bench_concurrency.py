@@ -0,0 +1,90 @@
+import os
+import json
+import time
+import asyncio
+import argparse
+
+import httpx
+
+from benchmarks.corpus import make_resume_text
+from benchmarks.server import free_port, serve
+
+# Overlapping /parse/design requests against the in-process app: with the
+# async completion backend, N concurrent requests should finish in about the
+# time of one instead of N times it. By default completions come from the fake
+# backend; --stand-in serves a local /v1/chat/completions over HTTP and sends
+# them through the real AsyncOpenAI client instead. Run from the repo root:
+#   python -m benchmarks.bench_concurrency --concurrency 1,8,32
+#   python -m benchmarks.bench_concurrency --stand-in
+
+
+async def one(client: httpx.AsyncClient, document: bytes) -> float:
+    began = time.perf_counter()
+    resp = await client.post("/parse/design", files={"file": ("cv.txt", document)})
+    resp.raise_for_status()
+    return time.perf_counter() - began
+
+
+async def run(args) -> list:
+    import resume_parser
+    import llm_client
+    transport = httpx.ASGITransport(app=resume_parser.app)
+    rounds, seed = [], 0
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://concurrency", timeout=None) as client:
+            await one(client, make_resume_text(40, seed=-1).encode())  # warm-up
+            for concurrency in args.concurrency:
+                # distinct documents, so neither the result cache nor coalescing shares a completion
+                documents = [make_resume_text(40, seed=seed + i).encode() for i in range(concurrency)]
+                seed += concurrency
+                began = time.perf_counter()
+                latencies = await asyncio.gather(*(one(client, document) for document in documents))
+                rounds.append({
+                    "concurrency": concurrency,
+                    "elapsed_ms": round(1000 * (time.perf_counter() - began), 1),
+                    "max_latency_ms": round(1000 * max(latencies), 1),
+                })
+    finally:
+        await llm_client.backend.aclose()
+    single = rounds[0]["elapsed_ms"]
+    for row in rounds:
+        row["vs_one_request"] = round(row["elapsed_ms"] / single, 2)
+        print(f"{row['concurrency']:>4} overlapping requests: {row['elapsed_ms']:>8} ms "
+              f"({row['vs_one_request']}x one request)")
+    return rounds
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", default="1,8,32", help="comma-separated; the first is the baseline")
+    parser.add_argument("--latency-ms", type=float, default=200, help="completion latency of the fake or stand-in")
+    parser.add_argument("--stand-in", action="store_true", help="serve completions over HTTP to the openai backend")
+    parser.add_argument("--output", default="bench_concurrency.json")
+    args = parser.parse_args()
+    args.concurrency = [int(count) for count in args.concurrency.split(",")]
+
+    os.environ.setdefault("LLM_CACHE_PATH", "")
+    os.environ.setdefault("BATCH_DB_PATH", ":memory:")
+    server = None
+    if args.stand_in:
+        # llm_backends reads its settings on import, so set them first
+        port = free_port()
+        os.environ.update(LLM_BACKEND="openai", OPENAI_BASE_URL=f"http://127.0.0.1:{port}/v1")
+        from benchmarks.bench_http_pool import stand_in_app
+        server = serve(stand_in_app(args.latency_ms), port)
+    else:
+        os.environ.setdefault("LLM_BACKEND", "fake")
+        os.environ["FAKE_LLM_LATENCY_MS"] = str(args.latency_ms)
+    try:
+        rounds = asyncio.run(run(args))
+    finally:
+        if server is not None:
+            server.should_exit = True
+
+    report = {"backend": os.environ["LLM_BACKEND"], "latency_ms": args.latency_ms, "rounds": rounds}
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import os
+import json
+import time
+import asyncio
+import argparse
+
+os.environ.setdefault("LLM_BACKEND", "fake")
+
+import deployment_rules
+import llm_client
+from resume_parser import SYSTEM_DEPLOYMENT_PROMPT, json_schema_deployment
+from jd_parser import SYSTEM_JD_DEPLOYMENT_PROMPT, JSON_SCHEMA_JD_DEPLOYMENT
+
+# Latency and field accuracy of the rule-based deployment extractors vs the
+# model, on the labelled résumé and JD corpora in benchmarks/data.
+# Run from the repo root:
+#   python -m benchmarks.bench_deployment_rules            (rules only)
+#   python -m benchmarks.bench_deployment_rules --model    (also call the model)
+
+DATA = os.path.join(os.path.dirname(__file__), "data")
+RESUME_FIELDS = ("system_type", "system_version", "deployment_type", "deployment_platform", "project_type")
+JD_FIELDS = ("system_versions", "deployment_models", "project_types")
+
+
+def load_corpus(path: str) -> list:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def resume_accuracy(result: dict, labels: dict) -> float:
+    return sum(1 for name in RESUME_FIELDS if (result.get(name) or "") == labels[name]) / len(RESUME_FIELDS)
+
+
+# JD fields are lists; a field counts when the set of entry names matches the labels
+def jd_accuracy(result: dict, labels: dict) -> float:
+    context = result.get("deployment_context", {})
+    return sum(
+        1 for name in JD_FIELDS
+        if sorted(entry["name"] for entry in context.get(name, [])) == sorted(labels[name])
+    ) / len(JD_FIELDS)
+
+
+# path -> (corpus file, rule extractor, accuracy, model prompt, model schema)
+PATHS = {
+    "resume": ("deployment_corpus.jsonl", deployment_rules.extract_resume, resume_accuracy,
+               SYSTEM_DEPLOYMENT_PROMPT, json_schema_deployment),
+    "jd": ("jd_deployment_corpus.jsonl", deployment_rules.extract_jd, jd_accuracy,
+           SYSTEM_JD_DEPLOYMENT_PROMPT, JSON_SCHEMA_JD_DEPLOYMENT),
+}
+
+
+def summarize(latencies: list, accuracies: list) -> dict:
+    return {
+        "count": len(latencies),
+        "mean_latency_ms": round(1000 * sum(latencies) / len(latencies), 4) if latencies else None,
+        "field_accuracy": round(sum(accuracies) / len(accuracies), 4) if accuracies else None,
+    }
+
+
+async def run_model(records: list, accuracy, prompt: str, schema: dict) -> tuple:
+    latencies, accuracies = [], []
+    for record in records:
+        began = time.perf_counter()
+        result = await llm_client._complete(record["text"], prompt, schema)
+        latencies.append(time.perf_counter() - began)
+        accuracies.append(accuracy(result, record["labels"]))
+    return latencies, accuracies
+
+
+def measure(records: list, extract, accuracy, prompt: str, schema: dict, model: bool) -> dict:
+    confident = []
+    rule_latencies, rule_accuracies = [], []
+    for record in records:
+        began = time.perf_counter()
+        result, confidence = extract(record["text"])
+        rule_latencies.append(time.perf_counter() - began)
+        if confidence >= deployment_rules.DEPLOYMENT_RULES_MIN_CONFIDENCE:
+            confident.append(record)
+            rule_accuracies.append(accuracy(result, record["labels"]))
+
+    report = {
+        "records": len(records),
+        "rules_coverage": round(len(confident) / len(records), 4),
+        # latency is over every record; accuracy over the records the rules
+        # answer, since the rest go to the model
+        "rules": summarize(rule_latencies, rule_accuracies),
+    }
+    if model:
+        report["model_all"] = summarize(*asyncio.run(run_model(records, accuracy, prompt, schema)))
+        report["model_on_rule_answered"] = summarize(*asyncio.run(run_model(confident, accuracy, prompt, schema)))
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data", default=DATA, help="directory holding the labelled corpora")
+    parser.add_argument("--model", action="store_true", help="also run every record through the model")
+    parser.add_argument("--output", default="bench_deployment_rules.json")
+    args = parser.parse_args()
+
+    report = {"min_confidence": deployment_rules.DEPLOYMENT_RULES_MIN_CONFIDENCE}
+    for name, (corpus, extract, accuracy, prompt, schema) in PATHS.items():
+        records = load_corpus(os.path.join(args.data, corpus))
+        report[name] = measure(records, extract, accuracy, prompt, schema, args.model)
+
+    print(json.dumps(report, indent=2))
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
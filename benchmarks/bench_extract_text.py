@@ -0,0 +1,83 @@
+import json
+import time
+import asyncio
+import argparse
+import tracemalloc
+
+import text_extract
+from benchmarks.pdf_factory import make_resume_pdf
+
+# extract_text micro-benchmark across page counts, font mixes and image-heavy
+# pages, for each available PDF extractor backend. Decoding runs inline
+# (PDF_WORKERS=0) so timings and memory belong to the extractor alone.
+# Run from the repo root:
+#   python -m benchmarks.bench_extract_text --extractors pypdf2,pypdf,pymupdf
+
+PROFILES = {
+    "text": {},
+    "many_fonts": {"fonts": ("Helvetica", "Times-Roman", "Courier", "Helvetica-Bold", "Times-Italic")},
+    "image_heavy": {"image_size": 128},
+}
+
+
+def available(extractor: str, sample: bytes) -> bool:
+    try:
+        text_extract._open(sample, extractor)
+        return True
+    except ImportError:
+        return False
+
+
+def measure(content: bytes, extractor: str, repeats: int) -> dict:
+    totals, page_timings, peaks = [], [], []
+    for _ in range(repeats):
+        tracemalloc.start()
+        began = time.perf_counter()
+        document = asyncio.run(text_extract.extract_pdf_document(content, extractor))
+        totals.append(time.perf_counter() - began)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        page_timings.extend(document.page_timings)
+    return {
+        "doc_ms": round(1000 * min(totals), 3),
+        "page_ms_mean": round(1000 * sum(page_timings) / len(page_timings), 3),
+        "page_ms_max": round(1000 * max(page_timings), 3),
+        "peak_python_kb": round(max(peaks) / 1024, 1),
+        "chars": len(document.text),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--extractors", default=",".join(text_extract.PDF_EXTRACTORS))
+    parser.add_argument("--pages", default="1,5,20,50")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--output", default="bench_extract_text.json")
+    args = parser.parse_args()
+
+    text_extract.PDF_WORKERS = 0
+    text_extract.PDF_MAX_CHARS = 0
+    page_counts = [int(count) for count in args.pages.split(",")]
+    sample = make_resume_pdf(1)
+    extractors = [name for name in args.extractors.split(",") if available(name, sample)]
+    skipped = sorted(set(args.extractors.split(",")) - set(extractors))
+    if skipped:
+        print(f"skipping extractors that are not installed: {', '.join(skipped)}")
+
+    results = []
+    for profile, options in PROFILES.items():
+        for pages in page_counts:
+            content = make_resume_pdf(pages, seed=pages, **options)
+            for extractor in extractors:
+                row = {"profile": profile, "pages": pages, "bytes": len(content), "extractor": extractor}
+                row.update(measure(content, extractor, args.repeats))
+                results.append(row)
+                print(f"{profile:<12} {pages:>3}p {extractor:<9} {row['page_ms_mean']:>8} ms/page "
+                      f"{row['peak_python_kb']:>10} KiB peak")
+
+    with open(args.output, "w") as f:
+        json.dump({"extractors": extractors, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
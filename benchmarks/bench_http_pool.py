@@ -0,0 +1,114 @@
+import os
+import json
+import time
+import asyncio
+import argparse
+
+os.environ.setdefault("OPENAI_API_KEY", "stand-in")
+
+from fastapi import FastAPI, Request
+
+import llm_backends
+from schema_tools import sample_result
+from benchmarks.server import free_port, serve
+
+# Connection reuse of the pooled model client under sustained bursts. A local
+# stand-in for /v1/chat/completions is served on 127.0.0.1 and the openai
+# backend is pointed at it; TCP connects should stay flat after the first
+# burst while the request count grows. The stand-in speaks plain HTTP/1.1, so
+# there are no TLS handshakes to count locally. Run from the repo root:
+#   python -m benchmarks.bench_http_pool --bursts 20 --concurrency 16
+
+SCHEMA = {
+    "name": "parse_probe",
+    "parameters": {
+        "type": "object",
+        "properties": {"modules": {"type": "array", "items": {"type": "string"}}},
+        "required": ["modules"],
+    },
+}
+
+
+def stand_in_app(latency_ms: float) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/v1/chat/completions")
+    async def completions(request: Request):
+        body = await request.json()
+        await asyncio.sleep(latency_ms / 1000)
+        schema = body["functions"][0]
+        return {
+            "id": "chatcmpl-stand-in",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body["model"],
+            "choices": [{
+                "index": 0,
+                "finish_reason": "stop",
+                "message": {
+                    "role": "assistant",
+                    "content": None,
+                    "function_call": {"name": schema["name"], "arguments": json.dumps(sample_result(schema))},
+                },
+            }],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 10, "total_tokens": 20},
+        }
+
+    return app
+
+
+async def run(args) -> list:
+    backend = llm_backends.OpenAIBackend()
+    messages = [{"role": "user", "content": "SAP EWM consultant"}]
+    rounds = []
+    try:
+        for burst in range(args.bursts):
+            began = time.perf_counter()
+            await asyncio.gather(*(
+                backend.create(model="stand-in", messages=messages, functions=[SCHEMA],
+                               function_call={"name": SCHEMA["name"]})
+                for _ in range(args.concurrency)
+            ))
+            stats = backend.stats()
+            rounds.append({"burst": burst, "elapsed_ms": round(1000 * (time.perf_counter() - began), 2), **stats})
+            print(f"burst {burst:>3}: requests={stats['requests']:>5} tcp_connects={stats['tcp_connects']:>4} "
+                  f"open={stats['open_connections']:>4} {rounds[-1]['elapsed_ms']:>8} ms")
+            await asyncio.sleep(args.pause_ms / 1000)
+    finally:
+        await backend.aclose()
+    return rounds
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bursts", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--pause-ms", type=float, default=50, help="idle gap between bursts")
+    parser.add_argument("--output", default="bench_http_pool.json")
+    args = parser.parse_args()
+
+    port = free_port()
+    server = serve(stand_in_app(args.latency_ms), port)
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{port}/v1"
+    try:
+        rounds = asyncio.run(run(args))
+    finally:
+        server.should_exit = True
+
+    # after the first burst warms the pool, later bursts should open no new connections
+    report = {
+        "concurrency": args.concurrency,
+        "max_keepalive_connections": llm_backends.LLM_MAX_KEEPALIVE_CONNECTIONS,
+        "first_burst_connects": rounds[0]["tcp_connects"],
+        "later_connects": rounds[-1]["tcp_connects"] - rounds[0]["tcp_connects"],
+        "rounds": rounds,
+    }
+    print(f"connects: {report['first_burst_connects']} in the first burst, "
+          f"{report['later_connects']} over the remaining {args.bursts - 1}")
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
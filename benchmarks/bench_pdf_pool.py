@@ -0,0 +1,56 @@
+import os
+import json
+import time
+import asyncio
+import argparse
+
+import text_extract
+from benchmarks.pdf_factory import make_resume_pdf
+
+# Throughput of process-pool PDF extraction as the worker count grows.
+# Run from the repo root: python -m benchmarks.bench_pdf_pool --docs 64 --pages 20
+
+
+async def run_corpus(corpus: list):
+    start = time.perf_counter()
+    docs = await asyncio.gather(*(text_extract.extract_pdf_document(doc) for doc in corpus))
+    page_timings = [seconds for doc in docs for seconds in doc.page_timings]
+    return time.perf_counter() - start, page_timings
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=32)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--output", default="bench_pdf_pool.json")
+    args = parser.parse_args()
+
+    corpus = [make_resume_pdf(args.pages, seed=i) for i in range(args.docs)]
+    worker_counts = [0] + sorted({min(2 ** i, args.max_workers) for i in range(args.max_workers.bit_length())})
+
+    results = []
+    for workers in worker_counts:
+        text_extract.shutdown_pool()
+        text_extract.PDF_WORKERS = workers
+        if workers:
+            # Warm the pool so process start-up is not counted
+            asyncio.run(run_corpus(corpus[:workers]))
+        elapsed, page_timings = asyncio.run(run_corpus(corpus))
+        results.append({
+            "workers": workers,
+            "seconds": round(elapsed, 4),
+            "mean_page_ms": round(1000 * sum(page_timings) / len(page_timings), 3),
+            "max_page_ms": round(1000 * max(page_timings), 3),
+            "docs_per_sec": round(len(corpus) / elapsed, 2),
+            "pages_per_sec": round(len(corpus) * args.pages / elapsed, 2),
+        })
+        print(f"workers={workers:>3}  {results[-1]['docs_per_sec']:>8} docs/s")
+    text_extract.shutdown_pool()
+
+    with open(args.output, "w") as f:
+        json.dump({"docs": args.docs, "pages": args.pages, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import os
+import json
+import time
+import asyncio
+import argparse
+
+os.environ.setdefault("LLM_BACKEND", "fake")
+os.environ.setdefault("LLM_CACHE_PATH", "")
+
+import llm_client
+import llm_backends
+import llm_scheduler
+from resume_parser import RESUME_PHASES
+from benchmarks.corpus import make_resume_text
+from benchmarks.load_test import percentile
+
+# Model-call scheduler under a stand-in that answers a share of calls with 429.
+# Interactive and batch calls compete for the same requests/min budget; the
+# report shows success rate, retries and latency per lane. Run from the repo root:
+#   python -m benchmarks.bench_scheduler --rpm 120 --error-rate 0.2 --calls 120
+
+
+async def run(args) -> dict:
+    llm_client.backend = llm_backends.FakeBackend(
+        latency_ms=args.latency_ms, error_rate=args.error_rate, error_status=429, seed=0
+    )
+    llm_scheduler.scheduler = llm_scheduler.Scheduler(args.rpm, args.tpm, args.max_retries)
+    prompt, schema = RESUME_PHASES["design"]
+    lanes = {lane: {"latencies": [], "failed": 0} for lane in llm_scheduler.LANES}
+    peak_depth = {lane: 0 for lane in llm_scheduler.LANES}
+
+    async def one(index: int):
+        lane = "batch" if index % (args.batch_share + 1) else "interactive"
+        llm_scheduler.current_lane.set(lane)
+        text = make_resume_text(40, seed=index)
+        began = time.perf_counter()
+        try:
+            await llm_client._complete(text, prompt, schema)
+            lanes[lane]["latencies"].append(time.perf_counter() - began)
+        except Exception:
+            lanes[lane]["failed"] += 1
+
+    async def sample_depth():
+        while True:
+            for lane, depth in llm_scheduler.scheduler.depth().items():
+                peak_depth[lane] = max(peak_depth[lane], depth)
+            await asyncio.sleep(0.01)
+
+    sampler = asyncio.create_task(sample_depth())
+    began = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(args.calls)))
+    elapsed = time.perf_counter() - began
+    sampler.cancel()
+
+    report = {"elapsed_s": round(elapsed, 2), "backend_calls": llm_client.backend.calls, "lanes": {}}
+    for lane, outcome in lanes.items():
+        latencies = outcome["latencies"]
+        report["lanes"][lane] = {
+            "ok": len(latencies),
+            "failed": outcome["failed"],
+            "peak_queue_depth": peak_depth[lane],
+            "p50_ms": round(1000 * percentile(latencies, 50), 1) if latencies else None,
+            "p95_ms": round(1000 * percentile(latencies, 95), 1) if latencies else None,
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=120)
+    parser.add_argument("--rpm", type=float, default=120)
+    parser.add_argument("--tpm", type=float, default=0)
+    parser.add_argument("--max-retries", type=int, default=llm_scheduler.LLM_MAX_RETRIES)
+    parser.add_argument("--error-rate", type=float, default=0.2, help="share of calls answered with 429")
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--batch-share", type=int, default=3, help="batch calls per interactive call")
+    parser.add_argument("--output", default="bench_scheduler.json")
+    args = parser.parse_args()
+
+    report = {"rpm": args.rpm, "tpm": args.tpm, "error_rate": args.error_rate, **asyncio.run(run(args))}
+    print(json.dumps(report, indent=2))
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import os
+import json
+import time
+import argparse
+
+os.environ.setdefault("LLM_BACKEND", "fake")
+
+import resume_sections
+import token_budget
+from resume_parser import RESUME_PHASES
+from benchmarks.corpus import make_resume_text
+
+# Prompt tokens per résumé phase with section filtering vs the full-text baseline,
+# plus the cost of segmenting. Run from the repo root:
+#   python -m benchmarks.bench_sections --docs 50 --lines 300
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=50)
+    parser.add_argument("--lines", type=int, default=300)
+    parser.add_argument("--output", default="bench_sections.json")
+    args = parser.parse_args()
+
+    corpus = [make_resume_text(args.lines, seed=i) for i in range(args.docs)]
+
+    began = time.perf_counter()
+    segmented = [resume_sections.segment(text) for text in corpus]
+    segment_ms = 1000 * (time.perf_counter() - began) / len(corpus)
+
+    phases = {}
+    for name, (prompt, schema) in RESUME_PHASES.items():
+        full = filtered = 0
+        for text, sections in zip(corpus, segmented):
+            full += token_budget.estimate_prompt_tokens(prompt, [schema], text)
+            phase_text = resume_sections.text_for_phase(text, name, sections)
+            filtered += token_budget.estimate_prompt_tokens(prompt, [schema], phase_text)
+        phases[name] = {
+            "full_prompt_tokens": full // len(corpus),
+            "filtered_prompt_tokens": filtered // len(corpus),
+            "reduction": round(1 - filtered / full, 4),
+        }
+        print(f"{name:<28} {phases[name]['full_prompt_tokens']:>7} -> {phases[name]['filtered_prompt_tokens']:>7}")
+
+    total_full = sum(p["full_prompt_tokens"] for p in phases.values())
+    total_filtered = sum(p["filtered_prompt_tokens"] for p in phases.values())
+    report = {
+        "docs": args.docs,
+        "lines": args.lines,
+        "segment_ms_per_doc": round(segment_ms, 4),
+        "total_reduction": round(1 - total_filtered / total_full, 4),
+        "phases": phases,
+    }
+    print(f"segment: {report['segment_ms_per_doc']} ms/doc, total reduction {report['total_reduction']:.1%}")
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import os
+import json
+import time
+import asyncio
+import argparse
+
+os.environ.setdefault("LLM_BACKEND", "fake")
+os.environ.setdefault("LLM_CACHE_PATH", "")
+os.environ.setdefault("BATCH_DB_PATH", ":memory:")
+
+import httpx
+
+import llm_client
+import llm_backends
+import schema_validation
+from schema_tools import sample_result
+from resume_parser import RESUME_PHASES
+from jd_parser import JD_SECTIONS
+from benchmarks.corpus import make_resume_text
+
+# Cost of schema validation, and repair outcomes when the model returns invalid
+# output. Part one times the compiled validator on a schema-conformant result
+# per schema; part two drives the per-phase routes against a fake backend that
+# leaves out a required property in a share of its outputs, then reads the
+# per-endpoint "validate" stage from /metrics. Run from the repo root:
+#   python -m benchmarks.bench_validation --invalid-rate 0.3
+
+
+def time_validators(repeats: int) -> dict:
+    timings = {}
+    for _, schema in list(RESUME_PHASES.values()) + list(JD_SECTIONS.values()):
+        result = sample_result(schema)
+        began = time.perf_counter()
+        for _ in range(repeats):
+            schema_validation.validate(schema, result)
+        timings[schema["name"]] = round(1e6 * (time.perf_counter() - began) / repeats, 2)
+    return timings
+
+
+def stage_totals(text: str, stage: str) -> dict:
+    # endpoint -> [sum seconds, count] from the resumeparser_stage_seconds series
+    totals = {}
+    for line in text.splitlines():
+        if f'stage="{stage}"' not in line:
+            continue
+        name, value = line.rsplit(" ", 1)
+        if name.startswith("resumeparser_stage_seconds_sum"):
+            index = 0
+        elif name.startswith("resumeparser_stage_seconds_count"):
+            index = 1
+        else:
+            continue
+        endpoint = name.split('endpoint="', 1)[1].split('"', 1)[0]
+        totals.setdefault(endpoint, [0.0, 0])[index] += float(value)
+    return totals
+
+
+async def drive_routes(args) -> dict:
+    import resume_parser
+    llm_client.backend = llm_backends.FakeBackend(latency_ms=args.latency_ms, invalid_rate=args.invalid_rate, seed=0)
+    routes = ["/parse/" + name for name in RESUME_PHASES] + ["/parse/jd/" + name for name in JD_SECTIONS]
+    transport = httpx.ASGITransport(app=resume_parser.app)
+    statuses = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://validation", timeout=None) as client:
+        for route in routes:
+            responses = await asyncio.gather(*(
+                client.post(route, files={"file": ("cv.txt", make_resume_text(80, seed).encode())})
+                for seed in range(args.requests)
+            ))
+            statuses[route] = sum(1 for resp in responses if resp.status_code == 200)
+        exposition = (await client.get("/metrics")).text
+
+    validate = stage_totals(exposition, "validate")
+    model_call = stage_totals(exposition, "model_call")
+    outcomes = {}
+    for line in exposition.splitlines():
+        if line.startswith("resumeparser_invalid_outputs_total{"):
+            outcome = line.split('outcome="', 1)[1].split('"', 1)[0]
+            outcomes[outcome] = outcomes.get(outcome, 0) + float(line.rsplit(" ", 1)[1])
+    endpoints = {}
+    for route in routes:
+        spent, checks = validate.get(route, [0.0, 0])
+        model_spent = model_call.get(route, [0.0, 0])[0]
+        endpoints[route] = {
+            "ok": statuses[route],
+            "validations": checks,
+            "validate_us_mean": round(1e6 * spent / checks, 2) if checks else None,
+            "share_of_model_time": round(spent / model_spent, 6) if model_spent else None,
+        }
+    return {"backend_calls": llm_client.backend.calls, "invalid_outputs": outcomes, "endpoints": endpoints}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeats", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=20, help="requests per route")
+    parser.add_argument("--invalid-rate", type=float, default=0.3)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--output", default="bench_validation.json")
+    args = parser.parse_args()
+
+    report = {
+        "validator_us_per_result": time_validators(args.repeats),
+        "repair_attempts": llm_client.LLM_REPAIR_ATTEMPTS,
+        "invalid_rate": args.invalid_rate,
+        **asyncio.run(drive_routes(args)),
+    }
+    print(json.dumps(report, indent=2))
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+import random
+
+from benchmarks.pdf_factory import WORDS, random_lines
+
+# Synthetic résumé text with the section headings real CVs tend to use.
+
+SECTIONS = (
+    ("PROFESSIONAL SUMMARY", 0.08),
+    ("Work Experience", 0.35),
+    ("Key Projects", 0.25),
+    ("Technical Skills", 0.07),
+    ("Education", 0.05),
+    ("Certifications", 0.05),
+    ("Trainings", 0.05),
+    ("Personal Details", 0.05),
+    ("Declaration", 0.05),
+)
+
+
+def make_resume_text(lines: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    parts = [f"Candidate {seed}", f"SAP {rng.choice(WORDS)} Consultant"]
+    for heading, share in SECTIONS:
+        parts.append(heading)
+        parts.extend(random_lines(max(1, int(lines * share)), rng))
+    return "\n".join(parts)
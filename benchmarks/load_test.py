@@ -0,0 +1,246 @@
+import os
+import json
+import time
+import asyncio
+import argparse
+import subprocess
+
+# Offline defaults: fake completion backend, no LLM result cache
+os.environ.setdefault("LLM_BACKEND", "fake")
+os.environ.setdefault("LLM_CACHE_PATH", "")
+os.environ.setdefault("BATCH_DB_PATH", ":memory:")
+
+import httpx
+
+from benchmarks.corpus import make_resume_text
+from benchmarks.pdf_factory import make_resume_pdf
+from benchmarks.server import free_port, serve
+
+# Load test for every /parse route against the local fake backend.
+# Run from the repo root:
+#   python -m benchmarks.load_test --requests 50 --concurrency 16
+#   python -m benchmarks.load_test --url http://localhost:8000   (a running server)
+#   python -m benchmarks.load_test --stream   (time to first result on the streaming routes)
+
+RESUME_ROUTES = (
+    "/parse/design",
+    "/parse/build",
+    "/parse/integration",
+    "/parse/wricef",
+    "/parse/integration_and_testing",
+    "/parse/module_and_tech_stack",
+    "/parse/system_deployment_context",
+)
+JD_ROUTES = (
+    "/parse/jd/module_specific",
+    "/parse/jd/business_process",
+    "/parse/jd/integration",
+    "/parse/jd/wricef",
+    "/parse/jd/integration_testing",
+    "/parse/jd/module_tech_stack",
+    "/parse/jd/deployment_context",
+)
+FANOUT_ROUTES = ("/parse/resume/all", "/parse/jd/all")
+STREAM_ROUTES = ("/parse/resume/stream?format=ndjson", "/parse/jd/stream?format=ndjson")
+
+# (label, filename, builder(seed) -> bytes)
+DOCUMENTS = (
+    ("txt_small", "cv.txt", lambda seed: make_resume_text(60, seed).encode()),
+    ("txt_large", "cv.txt", lambda seed: make_resume_text(600, seed).encode()),
+    ("pdf_1p", "cv.pdf", lambda seed: make_resume_pdf(1, seed)),
+    ("pdf_5p", "cv.pdf", lambda seed: make_resume_pdf(5, seed)),
+    ("pdf_20p", "cv.pdf", lambda seed: make_resume_pdf(20, seed)),
+)
+
+
+def percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def rss_kib(pid) -> int:
+    # VmRSS from /proc (Linux); 0 once the process is gone
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+# Peak combined RSS of this process and the live PDF pool workers, sampled
+# while the load runs: ru_maxrss for children only covers reaped processes and
+# reports the largest one rather than the sum
+async def sample_rss(peak: dict, interval: float = 0.1):
+    import text_extract
+    while True:
+        pool = text_extract._pool
+        workers = list(pool._processes or {}) if pool is not None else []
+        total = rss_kib("self") + sum(rss_kib(pid) for pid in workers)
+        peak["kib"] = max(peak["kib"], total)
+        await asyncio.sleep(interval)
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def drive(client: httpx.AsyncClient, route: str, documents: list, requests: int, concurrency: int) -> dict:
+    latencies, errors = [], 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(index: int):
+        nonlocal errors
+        filename, content = documents[index % len(documents)]
+        async with semaphore:
+            began = time.perf_counter()
+            resp = await client.post(route, files={"file": (filename, content)})
+            latencies.append(time.perf_counter() - began)
+            if resp.status_code != 200:
+                errors += 1
+
+    began = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - began
+    return {
+        "requests": requests,
+        "errors": errors,
+        "rps": round(requests / elapsed, 2),
+        "p50_ms": round(1000 * percentile(latencies, 50), 2),
+        "p95_ms": round(1000 * percentile(latencies, 95), 2),
+        "p99_ms": round(1000 * percentile(latencies, 99), 2),
+    }
+
+
+# Streaming routes: time to the first event (an array item or a whole section)
+# vs time to the whole profile
+async def drive_stream(client: httpx.AsyncClient, route: str, documents: list, requests: int,
+                       concurrency: int) -> dict:
+    first, complete, errors = [], [], 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(index: int):
+        nonlocal errors
+        filename, content = documents[index % len(documents)]
+        async with semaphore:
+            began = time.perf_counter()
+            async with client.stream("POST", route, files={"file": (filename, content)}) as resp:
+                if resp.status_code != 200:
+                    errors += 1
+                    await resp.aread()
+                    return
+                seen_first = False
+                async for line in resp.aiter_lines():
+                    if not line:
+                        continue
+                    event = json.loads(line)
+                    if event.get("done"):
+                        complete.append(time.perf_counter() - began)
+                        errors += bool(event["errors"])
+                    elif not seen_first:
+                        first.append(time.perf_counter() - began)
+                        seen_first = True
+
+    began = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - began
+    return {
+        "requests": requests,
+        "errors": errors,
+        "rps": round(requests / elapsed, 2),
+        "first_result_p50_ms": round(1000 * percentile(first, 50), 2),
+        "first_result_p95_ms": round(1000 * percentile(first, 95), 2),
+        "complete_p50_ms": round(1000 * percentile(complete, 50), 2),
+        "complete_p95_ms": round(1000 * percentile(complete, 95), 2),
+    }
+
+
+async def run(args) -> dict:
+    routes = RESUME_ROUTES + JD_ROUTES + (FANOUT_ROUTES if args.fanout else ())
+    server = None
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=None)
+    elif args.stream:
+        # ASGITransport buffers whole responses, so streaming needs a real socket
+        import resume_parser
+        port = free_port()
+        server = serve(resume_parser.app, port)
+        client = httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=None)
+    else:
+        import resume_parser
+        transport = httpx.ASGITransport(app=resume_parser.app)
+        client = httpx.AsyncClient(transport=transport, base_url="http://load-test", timeout=None)
+
+    results = {}
+    # RSS of a remote server is not visible from here, so --url reports none
+    sampler = None if args.url else asyncio.create_task(sample_rss(args.peak_rss))
+    try:
+        async with client:
+            for label, filename, build in DOCUMENTS:
+                # distinct documents per request so the text cache does not hide PDF cost
+                documents = [(filename, build(seed)) for seed in range(args.distinct_docs)]
+                if args.stream:
+                    for route in STREAM_ROUTES:
+                        stats = await drive_stream(client, route, documents, args.requests, args.concurrency)
+                        results.setdefault(route, {})[label] = stats
+                        print(f"{route:<40} {label:<10} first={stats['first_result_p50_ms']:>8}ms "
+                              f"complete={stats['complete_p50_ms']:>8}ms errors={stats['errors']}")
+                    continue
+                for route in routes:
+                    stats = await drive(client, route, documents, args.requests, args.concurrency)
+                    results.setdefault(route, {})[label] = stats
+                    print(f"{route:<40} {label:<10} p50={stats['p50_ms']:>8}ms p99={stats['p99_ms']:>8}ms "
+                          f"rps={stats['rps']:>7} errors={stats['errors']}")
+    finally:
+        if sampler is not None:
+            sampler.cancel()
+        if server is not None:
+            server.should_exit = True
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=40, help="requests per route and document size")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--distinct-docs", type=int, default=8)
+    parser.add_argument("--fanout", action="store_true", help="also drive /parse/resume/all and /parse/jd/all")
+    parser.add_argument("--stream", action="store_true",
+                        help="drive the streaming routes and report time to first result")
+    parser.add_argument("--url", help="target a running server instead of the in-process app")
+    parser.add_argument("--output", default="bench_load_test.json")
+    args = parser.parse_args()
+    args.peak_rss = {"kib": 0}
+
+    try:
+        results = asyncio.run(run(args))
+    finally:
+        if not args.url:
+            import text_extract
+            text_extract.shutdown_pool()
+
+    report = {
+        "revision": git_revision(),
+        "backend": os.environ.get("LLM_BACKEND"),
+        "fake_latency_ms": os.environ.get("FAKE_LLM_LATENCY_MS", "200"),
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        # this process plus the PDF pool workers; None against --url
+        "peak_rss_mb": None if args.url else round(args.peak_rss["kib"] / 1024, 1),
+        "routes": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    if report["peak_rss_mb"] is not None:
+        print(f"peak RSS (server and PDF workers) {report['peak_rss_mb']} MB")
+    print(f"results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import random
+
+# Minimal PDF writer for generating benchmark corpora without extra dependencies.
+# Each page is a list of text lines set in one of the standard Type1 fonts.
+
+WORDS = (
+    "SAP S/4HANA TM EWM SD MM FI CO configuration integration IDoc BAPI OData CPI "
+    "rollout implementation upgrade migration workshop blueprint freight order "
+    "putaway billing delivery warehouse consultant project design build testing "
+    "cutover hypercare ABAP SmartForms Adobe workflow BRF+ LSMW enhancement BAdI"
+).split()
+
+
+def random_lines(count: int, rng: random.Random, words_per_line: int = 12) -> list:
+    return [" ".join(rng.choice(WORDS) for _ in range(words_per_line)) for _ in range(count)]
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+# fonts: standard Type1 fonts rotated line by line (more fonts = more font
+# resources for the extractor to resolve). image_size: side in pixels of an
+# uncompressed RGB image drawn on every page (0 = text only).
+def make_pdf(pages: list, fonts=("Helvetica",), image_size: int = 0, seed: int = 0) -> bytes:
+    rng = random.Random(seed)
+    objects = []  # object bodies, numbered from 1
+
+    def add(body: bytes) -> int:
+        objects.append(body)
+        return len(objects)
+
+    def add_stream(header: str, data: bytes) -> int:
+        return add(f"<< {header} /Length {len(data)} >>\nstream\n".encode() + data + b"\nendstream")
+
+    catalog = add(b"")  # filled in once the page tree exists
+    page_tree = add(b"")
+    font_refs = [add(f"<< /Type /Font /Subtype /Type1 /BaseFont /{font} >>".encode()) for font in fonts]
+    font_resources = " ".join(f"/F{i + 1} {ref} 0 R" for i, ref in enumerate(font_refs))
+
+    page_refs = []
+    for lines in pages:
+        stream = []
+        xobjects = ""
+        if image_size:
+            pixels = bytes(rng.getrandbits(8) for _ in range(image_size * image_size * 3))
+            image_ref = add_stream(
+                f"/Type /XObject /Subtype /Image /Width {image_size} /Height {image_size} "
+                "/ColorSpace /DeviceRGB /BitsPerComponent 8",
+                pixels,
+            )
+            xobjects = f"/XObject << /Im1 {image_ref} 0 R >>"
+            stream.append("q 300 0 0 300 150 50 cm /Im1 Do Q")
+        stream += ["BT", "12 TL", "50 780 Td"]
+        for index, line in enumerate(lines):
+            stream.append(f"/F{index % len(fonts) + 1} 10 Tf ({_escape(line)}) Tj T*")
+        stream.append("ET")
+        content_ref = add_stream("", "\n".join(stream).encode("latin-1", errors="replace"))
+        page_refs.append(add(
+            f"<< /Type /Page /Parent {page_tree} 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << {font_resources} >> {xobjects} >> "
+            f"/Contents {content_ref} 0 R >>".encode()
+        ))
+
+    kids = " ".join(f"{ref} 0 R" for ref in page_refs)
+    objects[page_tree - 1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_refs)} >>".encode()
+    objects[catalog - 1] = f"<< /Type /Catalog /Pages {page_tree} 0 R >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref_at = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1, catalog, xref_at
+    )
+    return bytes(out)
+
+
+def make_resume_pdf(page_count: int, seed: int = 0, lines_per_page: int = 55,
+                    fonts=("Helvetica",), image_size: int = 0) -> bytes:
+    rng = random.Random(seed)
+    pages = [random_lines(lines_per_page, rng) for _ in range(page_count)]
+    return make_pdf(pages, fonts=fonts, image_size=image_size, seed=seed)
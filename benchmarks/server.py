@@ -0,0 +1,23 @@
+import time
+import socket
+import threading
+
+import uvicorn
+
+# Serve an ASGI app on 127.0.0.1 in a background thread, for benchmarks that
+# need a real socket (connection reuse, streamed responses: httpx's in-process
+# ASGITransport buffers the whole response body).
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def serve(app, port: int) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server
@@ -0,0 +1,104 @@
+import os
+import json
+import asyncio
+import argparse
+
+import llm_scheduler
+from jd_parser import parse_jd_profile
+from resume_parser import parse_resume_profile
+from text_extract import SUPPORTED_EXTENSIONS, extract_text_from_bytes, shutdown_pool
+
+# Offline bulk runner: parse every résumé/JD under a directory without going
+# through HTTP. Results are appended to a JSONL file and every successful
+# document is recorded in a checkpoint file, so an interrupted run resumes
+# where it stopped.
+#
+#   python bulk_parse.py ./cvs --kind resume --workers 8 --output cvs.jsonl
+
+
+def find_documents(root: str) -> list:
+    paths = []
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            if filename.lower().endswith(SUPPORTED_EXTENSIONS):
+                paths.append(os.path.relpath(os.path.join(dirpath, filename), root))
+    return sorted(paths)
+
+
+def load_checkpoint(path: str) -> set:
+    if not os.path.exists(path):
+        return set()
+    with open(path, encoding="utf-8") as f:
+        return {line.rstrip("\n") for line in f if line.strip()}
+
+
+async def parse_document(root: str, relpath: str, kind: str) -> dict:
+    with open(os.path.join(root, relpath), "rb") as f:
+        content = f.read()
+    text = await extract_text_from_bytes(relpath, content)
+    if not text.strip():
+        raise ValueError("Empty file content")
+    if kind == "jd":
+        return await parse_jd_profile(text)
+    return await parse_resume_profile(text)
+
+
+async def run(root: str, kind: str, workers: int, output: str, checkpoint: str):
+    llm_scheduler.current_lane.set("batch")
+    done = load_checkpoint(checkpoint)
+    pending = [path for path in find_documents(root) if path not in done]
+    print(f"{len(pending)} documents to parse ({len(done)} already done)")
+
+    queue = asyncio.Queue()
+    for path in pending:
+        queue.put_nowait(path)
+    write_lock = asyncio.Lock()
+    counts = {"ok": 0, "failed": 0}
+
+    with open(output, "a", encoding="utf-8") as out, open(checkpoint, "a", encoding="utf-8") as ckpt:
+        async def worker():
+            while not queue.empty():
+                path = queue.get_nowait()
+                record = {"path": path, "kind": kind}
+                try:
+                    record["result"] = await parse_document(root, path, kind)
+                    # JD profiles report failed sections instead of raising; the
+                    # partial result is written but not checkpointed, so a re-run retries it
+                    if record["result"].get("errors"):
+                        record["error"] = f"sections failed: {', '.join(record['result']['errors'])}"
+                except Exception as e:
+                    record["error"] = str(getattr(e, "detail", e))
+                async with write_lock:
+                    out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    out.flush()
+                    if "error" in record:
+                        counts["failed"] += 1
+                    else:
+                        ckpt.write(path + "\n")
+                        ckpt.flush()
+                        counts["ok"] += 1
+
+        await asyncio.gather(*(worker() for _ in range(max(workers, 1))))
+    print(f"parsed {counts['ok']}, failed {counts['failed']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-parse a directory of résumés or JDs")
+    parser.add_argument("directory")
+    parser.add_argument("--kind", choices=["resume", "jd"], default="resume")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--output", default="parsed.jsonl")
+    parser.add_argument("--checkpoint", help="defaults to <output>.checkpoint")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(run(
+            args.directory, args.kind, args.workers, args.output,
+            args.checkpoint or f"{args.output}.checkpoint"
+        ))
+    finally:
+        shutdown_pool()
+
+
+if __name__ == "__main__":
+    main()
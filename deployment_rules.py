@@ -0,0 +1,266 @@
+import os
+import re
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Deterministic fast path for the deployment-context schemas. Most of their
+# fields are literal strings ("S/4HANA 1909", "RISE", "Rollout"), so regexes
+# and vocab tables fill them; the model is only called when the rules are not
+# confident (a field is missing or the text names several candidates).
+DEPLOYMENT_RULES = os.getenv("DEPLOYMENT_RULES", "1") == "1"
+DEPLOYMENT_RULES_MIN_CONFIDENCE = float(os.getenv("DEPLOYMENT_RULES_MIN_CONFIDENCE", "1.0"))
+
+_S4 = r"s/?4\s?-?hana"
+SYSTEM_TYPES = {
+    "S/4HANA": _S4 + r"|\bs4h\b",
+    "BW/4HANA": r"\bbw/?4\s?-?hana\b",
+    "ECC": r"\becc\b|\bsap r/3\b|\br/3\b",
+    "BTP": r"\bbtp\b|business technology platform",
+    "CRM": r"\bsap crm\b",
+    "SRM": r"\bsap srm\b",
+    "SCM": r"\bsap scm\b|\bsap apo\b",
+}
+
+# Version patterns capture the version next to the system that owns it
+SYSTEM_VERSIONS = (
+    ("S/4HANA", _S4 + r"\s*(?:on[- ]premise\s*)?(?:version\s*)?(1[5-9][01]9|1511|1610|20[2-3]\d)\b"),
+    ("ECC", r"\becc\s*(6\.0(?:\s*ehp\s*\d+)?)"),
+    ("BW/4HANA", r"\bbw/?4\s?-?hana\s*(2\.0|1\.0|20[2-3]\d)\b"),
+)
+
+DEPLOYMENT_PLATFORMS = {
+    # "rise" is also an English word: only the product name or upper-case RISE
+    "RISE": r"\brise with sap\b|(?-i:\bRISE\b)",
+    "HEC": r"\bhec\b|hana enterprise cloud",
+    "SAP BTP": r"\bsap btp\b",
+    "SAP Cloud Platform": r"\bsap cloud platform\b|\bscp\b",
+    "Azure": r"\bazure\b",
+    "AWS": r"\baws\b|amazon web services",
+    "GCP": r"\bgcp\b|google cloud",
+}
+
+DEPLOYMENT_TYPES = {
+    "On-Prem": r"\bon[- ]prem(?:ise|ises)?\b",
+    "Cloud": r"\b(?:public|private) cloud\b|\bcloud (?:edition|deployment)\b",
+    "Hybrid": r"\bhybrid\b",
+}
+
+PROJECT_TYPES = {
+    "Implementation": r"\bimplementations?\b|\bgreenfield\b|\bend[- ]to[- ]end\b",
+    "Rollout": r"\brollouts?\b|\broll[- ]outs?\b",
+    "Migration": r"\bmigrations?\b|\bbrownfield\b|\bsystem conversion\b",
+    "Upgrade": r"\bupgrades?\b",
+    "Support": r"\bproduction support\b|\bsupport project\b",
+    "AMS": r"\bams\b|application management services",
+    "Pilot": r"\bpilot\b",
+    "PoC": r"\bpoc\b|proof of concept",
+}
+
+# JD system versions use the prompt's names ("sap_tm_9.5", "s4_hana_2021",
+# "ecc_6.0"): a product pattern, optionally followed by its version
+JD_SYSTEMS = {
+    "s4_hana": _S4 + r"|\bs4h\b",
+    "bw4_hana": r"\bbw/?4\s?-?hana\b",
+    "ecc": r"\becc\b|\bsap r/3\b",
+    "sap_tm": r"\btm\b",
+    "sap_ewm": r"\bewm\b",
+    "sap_gts": r"\bgts\b",
+    "sap_mdg": r"\bmdg\b",
+    "sap_ibp": r"\bibp\b",
+    "sap_apo": r"\bapo\b",
+    "sap_crm": r"\bsap crm\b",
+    "sap_srm": r"\bsap srm\b",
+}
+_JD_VERSION = r"\d+\.\d+(?:\s*ehp\s*\d+)?|(?:1[5-9]|2[0-3])\d{2}\b"
+# Anything that looks like a release, to tell whether every version was matched
+_VERSION_LIKE = re.compile(r"\b(?:\d+\.\d+|(?:1[5-9]|2[0-3])\d{2})\b")
+
+_MIGRATION = re.compile(
+    r"\bfrom\s+(ecc(?:\s*6\.0(?:\s*ehp\s*\d+)?)?|" + _S4 + r"\s*\d{4})\s+to\s+(" + _S4 + r"\s*\d{4})",
+    re.IGNORECASE,
+)
+
+
+def _compile(table: dict) -> dict:
+    return {value: re.compile(pattern, re.IGNORECASE) for value, pattern in table.items()}
+
+
+_SYSTEM_TYPES = _compile(SYSTEM_TYPES)
+_SYSTEM_VERSIONS = [(system, re.compile(pattern, re.IGNORECASE)) for system, pattern in SYSTEM_VERSIONS]
+_PLATFORMS = _compile(DEPLOYMENT_PLATFORMS)
+_DEPLOYMENT_TYPES = _compile(DEPLOYMENT_TYPES)
+_PROJECT_TYPES = _compile(PROJECT_TYPES)
+_JD_SYSTEMS = {
+    name: re.compile(
+        rf"(?:{pattern})(?:\s*(?:on[- ]premise\s+)?(?:version\s*)?({_JD_VERSION}))?", re.IGNORECASE
+    )
+    for name, pattern in JD_SYSTEMS.items()
+}
+
+stats = {"rules": 0, "model": 0}
+
+
+def _matches(table: dict, text: str) -> list:
+    return [value for value, pattern in table.items() if pattern.search(text)]
+
+
+def _normalize_version(version: str) -> str:
+    return re.sub(r"\s+", " ", version.upper()).strip()
+
+
+# Candidate values per field, as found in the text
+def scan(text: str) -> dict:
+    versions = {}
+    for system, pattern in _SYSTEM_VERSIONS:
+        for match in pattern.finditer(text):
+            versions.setdefault(system, set()).add(_normalize_version(match.group(1)))
+    migration = _MIGRATION.search(text)
+    platforms = _matches(_PLATFORMS, text)
+    # Deployment types come only from stated ones: platforms are often named
+    # in passing ("Skills: ABAP, SQL, AWS basics")
+    deployment_types = _matches(_DEPLOYMENT_TYPES, text)
+    return {
+        "system_types": _matches(_SYSTEM_TYPES, text),
+        "versions": versions,
+        "migration": migration.groups() if migration else None,
+        "platforms": platforms,
+        "deployment_types": deployment_types,
+        "project_types": _matches(_PROJECT_TYPES, text),
+    }
+
+
+def _single(values) -> str:
+    return next(iter(values)) if len(values) == 1 else ""
+
+
+# Résumé schema (json_schema_deployment): returns (result, confidence in [0, 1])
+def extract_resume(text: str):
+    found = scan(text)
+    system_types = found["system_types"]
+    if "S/4HANA" in system_types and found["migration"]:
+        system_type = "S/4HANA"  # conversions mention both ECC and the S/4HANA target
+    else:
+        system_type = _single(system_types)
+    result = {
+        "system_type": system_type,
+        "system_version": _single(found["versions"].get(system_type, ())),
+        "system_version_from": "",
+        "system_version_to": "",
+        "deployment_type": _single(found["deployment_types"]),
+        "deployment_platform": _single(found["platforms"]),
+        "project_type": _single(found["project_types"]),
+    }
+    if found["migration"]:
+        source, target = (_normalize_version(part) for part in found["migration"])
+        result["system_version_from"] = source
+        result["system_version_to"] = target
+        result["system_version"] = result["system_version"] or _normalize_version(target.split()[-1])
+        if not result["project_type"] or set(found["project_types"]) <= {"Migration", "Upgrade", "Implementation"}:
+            result["project_type"] = "Migration" if "ecc" in source.lower() else "Upgrade"
+    required = ("system_type", "system_version", "deployment_type", "deployment_platform", "project_type")
+    filled = sum(1 for name in required if result[name] and name != "deployment_platform")
+    if result["deployment_type"] == "On-Prem":
+        # on-premise systems have no hosting platform; naming one as well is a conflict
+        filled += not result["deployment_platform"]
+    else:
+        filled += bool(result["deployment_platform"])
+    confidence = filled / len(required)
+    return result, confidence
+
+
+JD_DEPLOYMENT_MODELS = {"On-Prem": "on_premise", "Cloud": "cloud", "Hybrid": "hybrid"}
+JD_PROJECT_TYPES = {
+    "Rollout": "rollout",
+    "Migration": "migration",
+    "Upgrade": "upgrade",
+    "Support": "support",
+    "AMS": "support",
+}
+
+
+# System versions named the prompt's way; the second value is False when a
+# version-like number in the text belongs to none of the matched products
+def _jd_system_versions(text: str):
+    versions, unversioned, spans = set(), set(), []
+    for name, pattern in _JD_SYSTEMS.items():
+        for match in pattern.finditer(text):
+            if match.group(1):
+                version = re.sub(r"\s*ehp\s*", "_ehp", match.group(1).lower())
+                versions.add((name, f"{name}_{version}"))
+                spans.append(match.span(1))
+            else:
+                unversioned.add(name)
+    versioned = {name for name, _ in versions}
+    entries = [{"name": full, "notes": "explicit version mention"} for _, full in sorted(versions)]
+    entries += [{"name": name, "notes": "no version stated"} for name in sorted(unversioned - versioned)]
+    complete = all(
+        any(start <= match.start() and match.end() <= stop for start, stop in spans)
+        for match in _VERSION_LIKE.finditer(text)
+    )
+    return entries, complete
+
+
+# JD schema (JSON_SCHEMA_JD_DEPLOYMENT): returns (result, confidence in [0, 1]).
+# JDs name platforms in passing ("AWS certification a plus"), so deployment
+# models come only from stated deployment types; a platform with no stated type,
+# an implementation that is neither greenfield nor brownfield, or a version the
+# product table does not place is left to the model.
+def extract_jd(text: str):
+    found = scan(text)
+    system_versions, complete = _jd_system_versions(text)
+    unsure = not complete
+    deployment_models = [
+        {"name": JD_DEPLOYMENT_MODELS[value], "notes": f"stated {JD_DEPLOYMENT_MODELS[value].replace('_', '-')} deployment"}
+        for value in found["deployment_types"]
+    ]
+    unsure = unsure or (bool(found["platforms"]) and not deployment_models)
+    if re.search(r"\bembedded\b", text, re.IGNORECASE):
+        deployment_models.append({"name": "embedded", "notes": "embedded deployment mentioned"})
+
+    project_types = []
+    for landscape in ("greenfield", "brownfield"):
+        if re.search(rf"\b{landscape}\b", text, re.IGNORECASE):
+            project_types.append({"name": f"{landscape}_implementation", "notes": f"{landscape} implementation"})
+    for value in found["project_types"]:
+        if value == "Implementation":
+            # greenfield vs brownfield needs the model's judgement
+            unsure = unsure or not project_types
+        elif value == "Migration":
+            # "brownfield" and "system conversion" alone are brownfield implementations
+            if re.search(r"\bmigrations?\b", text, re.IGNORECASE):
+                project_types.append({"name": "migration", "notes": "migration mentioned"})
+        elif value in JD_PROJECT_TYPES:
+            name = JD_PROJECT_TYPES[value]
+            if all(entry["name"] != name for entry in project_types):
+                project_types.append({"name": name, "notes": f"{value.lower()} mentioned"})
+        else:
+            unsure = True
+
+    result = {"deployment_context": {
+        "system_versions": system_versions,
+        "deployment_models": deployment_models,
+        "project_types": project_types,
+    }}
+    filled = sum(1 for values in result["deployment_context"].values() if values)
+    confidence = (filled - (1 if unsure else 0)) / 3
+    return result, max(confidence, 0.0)
+
+
+EXTRACTORS = {
+    "parse_system_deployment_context": extract_resume,
+    "parse_jd_deployment_context": extract_jd,
+}
+
+
+# Rule-based result when the rules are confident enough, else None (call the model)
+def fast_path(text: str, function_schema: dict):
+    extractor = EXTRACTORS.get(function_schema["name"])
+    if not DEPLOYMENT_RULES or extractor is None:
+        return None
+    result, confidence = extractor(text)
+    if confidence >= DEPLOYMENT_RULES_MIN_CONFIDENCE:
+        stats["rules"] += 1
+        return result
+    stats["model"] += 1
+    return None
@@ -0,0 +1,91 @@
+import json
+
+# Incremental decoder for a JSON document that arrives in chunks (streamed
+# function-call arguments). It does not build the document; it scans each
+# chunk once and reports every array item as soon as the item is complete, so
+# callers can forward or check items while the model is still generating.
+# The full document is still decoded with json.loads once the stream ends.
+
+
+class _Frame:
+    __slots__ = ("kind", "key", "index", "item_start", "expect_key")
+
+    def __init__(self, kind: str):
+        self.kind = kind          # "{" or "["
+        self.key = None           # object: key of the member being read
+        self.index = 0            # array: index of the item being read
+        self.item_start = None    # array: offset where the current item began
+        self.expect_key = kind == "{"
+
+
+class IncrementalJSONParser:
+    def __init__(self):
+        self.text = ""
+        self._pos = 0
+        self._stack = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+
+    # Returns [(path, item)] for the array items completed by this chunk; path
+    # is a tuple of object keys and array indexes, e.g. ("primary_modules", 0)
+    def feed(self, chunk: str) -> list:
+        self.text += chunk
+        items = []
+        text, stack = self.text, self._stack
+        for pos in range(self._pos, len(text)):
+            char = text[pos]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    top = stack[-1] if stack else None
+                    if top is not None and top.kind == "{" and top.expect_key:
+                        top.key = json.loads(text[self._string_start:pos + 1])
+                    elif top is not None and top.kind == "[":
+                        self._emit(items, top, pos + 1)
+                continue
+            if char == '"':
+                self._begin_value(pos)
+                self._in_string = True
+                self._string_start = pos
+            elif char in "{[":
+                self._begin_value(pos)
+                stack.append(_Frame(char))
+            elif char in "}]":
+                frame = stack.pop()
+                if frame.kind == "[" and frame.item_start is not None:
+                    stack.append(frame)
+                    self._emit(items, frame, pos)
+                    stack.pop()
+                if stack and stack[-1].kind == "[":
+                    self._emit(items, stack[-1], pos + 1)
+            elif char == ",":
+                top = stack[-1]
+                if top.kind == "[":
+                    if top.item_start is not None:
+                        self._emit(items, top, pos)
+                    top.index += 1
+                else:
+                    top.expect_key = True
+            elif char == ":":
+                stack[-1].expect_key = False
+            elif not char.isspace():
+                self._begin_value(pos)
+        self._pos = len(text)
+        return items
+
+    def _begin_value(self, pos: int):
+        if self._stack:
+            top = self._stack[-1]
+            if top.kind == "[" and top.item_start is None:
+                top.item_start = pos
+
+    def _emit(self, items: list, frame: _Frame, end: int):
+        value = json.loads(self.text[frame.item_start:end])
+        frame.item_start = None
+        path = tuple(f.key if f.kind == "{" else f.index for f in self._stack)
+        items.append((path, value))
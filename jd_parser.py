@@ -1,60 +1,54 @@
 import os
 import json
-from fastapi import APIRouter, File, UploadFile, HTTPException
+import asyncio
+from functools import partial
+import openai
+from fastapi import APIRouter, File, Query, UploadFile, HTTPException
 from fastapi.responses import JSONResponse
-import PyPDF2
-from openai import OpenAI
-import io
 from dotenv import load_dotenv
+from llm_client import PARSE_MODE, PARSE_MODES, call_function, call_functions_combined
+from text_extract import extract_text_from_bytes
+from token_budget import PromptTooLarge
+import metrics
+import schema_validation
+from schema_validation import InvalidModelOutput
+from streaming import iter_sections, stream_response, check_format
 
 jd_router = APIRouter()
 
 load_dotenv()
 
-
-# Initialize OpenAI client
-client = OpenAI(api_key= os.getenv("OPENAI_API_KEY"))
-MODEL = "gpt-4o-2024-08-06"  # Fixed valid model name
+# Max number of JD sections parsed at once by /all
+JD_PARSE_CONCURRENCY = int(os.getenv("JD_PARSE_CONCURRENCY", "7"))
 
 # Helper: Extract text from PDF/text files
 async def extract_text(file: UploadFile) -> str:
     try:
-        content = await file.read()
-        if file.filename.lower().endswith(".pdf"):
-            reader = PyPDF2.PdfReader(io.BytesIO(content))
-            return "\n".join(page.extract_text() or "" for page in reader.pages)
-        return content.decode("utf-8", errors="ignore")
+        with metrics.span("upload_read"):
+            content = await file.read()
+        return await extract_text_from_bytes(file.filename, content)
     except Exception as e:
         raise HTTPException(400, f"File read error: {str(e)}")
 
 # Generic OpenAI parser with enhanced error handling
-async def call_parser(text: str, system_prompt: str, function_schema: dict):
+async def call_parser(text: str, system_prompt: str, function_schema: dict, on_item=None):
     try:
         # Validate input
         if not text.strip():
             raise ValueError("Empty text content")
             
-        # API call
-        resp = client.chat.completions.create(
-            model=MODEL,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": text}
-            ],
-            functions=[function_schema],
-            function_call={"name": function_schema["name"]}
-        )
-        print("token usage:", resp.usage.total_tokens)
-        
-        # Validate response
-        if not resp.choices[0].message.function_call:
-            raise ValueError("No function call in response")
-            
-        # Parse arguments
-        args = resp.choices[0].message.function_call.arguments
-        print(f"Raw OpenAI response: {args}")
-        return json.loads(args)
+        # API call (async, shared client in llm_client)
+        return await call_function(text, system_prompt, function_schema, on_item)
         
+    except PromptTooLarge as e:
+        raise HTTPException(413, str(e))
+    except InvalidModelOutput as e:
+        raise HTTPException(502, str(e))
+    except openai.RateLimitError:
+        # only after llm_scheduler has used up its retries
+        raise HTTPException(429, "OpenAI rate limit exceeded, retry later", headers={"Retry-After": "30"})
+    except openai.APIError as e:
+        raise HTTPException(502, f"OpenAI API error: {str(e)}")
     except json.JSONDecodeError:
         raise HTTPException(500, "Failed to parse OpenAI response")
     except Exception as e:
@@ -385,7 +379,6 @@ JSON_SCHEMA_JD_WRICEF = {
 @jd_router.post("/wricef")
 async def parse_jd_wricef(file: UploadFile = File(...)):
     text = await extract_text(file)
-    print(f"Extracted text: {text[:500]}...")  # Log the first 500 characters for debugging
     if not text.strip():
         raise HTTPException(400, "Empty file content")
     result = await call_parser(text, SYSTEM_JD_WRICEF_PROMPT, JSON_SCHEMA_JD_WRICEF)
@@ -554,7 +547,6 @@ JSON_SCHEMA_JD_INT_TST = {
 @jd_router.post("/integration_testing")
 async def parse_jd_integration_testing(file: UploadFile = File(...)):
     text = await extract_text(file)
-    print(f"Extracted text: {text[:500]}...")  # Log the first 500 characters for debugging
     if not text.strip():
         raise HTTPException(400, "Empty file content")
     result = await call_parser(text, SYSTEM_JD_INT_TST_PROMPT, JSON_SCHEMA_JD_INT_TST)
@@ -879,7 +871,6 @@ JSON_SCHEMA_JD_MODULE_TECH = {
 @jd_router.post("/module_tech_stack")
 async def parse_jd_module_tech_stack(file: UploadFile = File(...)):
     text = await extract_text(file)
-    print(f"Extracted text: {text[:500]}...")  # Log the first 500 characters for debugging
     if not text.strip():
         raise HTTPException(400, "Empty file content")
     result = await call_parser(text, SYSTEM_JD_MODULE_TECH_PROMPT, JSON_SCHEMA_JD_MODULE_TECH)
@@ -1114,8 +1105,91 @@ JSON_SCHEMA_JD_DEPLOYMENT = {
 @jd_router.post("/deployment_context")
 async def parse_jd_deployment_context(file: UploadFile = File(...)):
     text = await extract_text(file)
-    print(f"Extracted text: {text[:500]}...")  # Log the first 500 characters for debugging
     if not text.strip():
         raise HTTPException(400, "Empty file content")
     result = await call_parser(text, SYSTEM_JD_DEPLOYMENT_PROMPT, JSON_SCHEMA_JD_DEPLOYMENT)
-    return JSONResponse(content=result)
\ No newline at end of file
+    return JSONResponse(content=result)
+
+# ===== All sections in one request =====
+# Section name -> (system prompt, function schema), one entry per JD route
+JD_SECTIONS = {
+    "module_specific": (SYSTEM_JD_MODULE_SPECIFIC_PROMPT, JSON_SCHEMA_JD_MODULE_SPECIFIC),
+    "business_process": (SYSTEM_JD_BPM_PROMPT, JSON_SCHEMA_JD_BPM),
+    "integration": (SYSTEM_JD_INTEGRATION_PROMPT, JSON_SCHEMA_JD_INTEGRATION),
+    "wricef": (SYSTEM_JD_WRICEF_PROMPT, JSON_SCHEMA_JD_WRICEF),
+    "integration_testing": (SYSTEM_JD_INT_TST_PROMPT, JSON_SCHEMA_JD_INT_TST),
+    "module_tech_stack": (SYSTEM_JD_MODULE_TECH_PROMPT, JSON_SCHEMA_JD_MODULE_TECH),
+    "deployment_context": (SYSTEM_JD_DEPLOYMENT_PROMPT, JSON_SCHEMA_JD_DEPLOYMENT),
+}
+schema_validation.register(schema for _, schema in JD_SECTIONS.values())
+
+# Sections resolved by one combined completion ({} in split mode). If it
+# fails, every section falls back to its own call.
+async def _combined_jd_sections(text: str, mode: str) -> dict:
+    if mode != "combined":
+        return {}
+    try:
+        return await call_functions_combined(text, JD_SECTIONS)
+    except Exception:
+        metrics.inc("resumeparser_combined_fallbacks_total", kind="jd")
+        return {}
+
+# Split calls for the sections combined mode did not resolve, at most
+# JD_PARSE_CONCURRENCY at a time: name -> start(on_item=None) -> coroutine
+def _split_jd_calls(text: str, names: list) -> dict:
+    semaphore = asyncio.Semaphore(JD_PARSE_CONCURRENCY)
+
+    async def run(prompt: str, schema: dict, on_item=None):
+        async with semaphore:
+            return await call_parser(text, prompt, schema, on_item)
+
+    return {name: partial(run, *JD_SECTIONS[name]) for name in names}
+
+# Parse every section concurrently (bounded by JD_PARSE_CONCURRENCY).
+# A failing section is reported under "errors" instead of failing the request.
+# In "combined" mode the sections are first packed into one completion; if that
+# fails or leaves sections out, those run as separate calls.
+async def parse_jd_profile(text: str, mode: str = PARSE_MODE) -> dict:
+    errors = {}
+    results = await _combined_jd_sections(text, mode)
+    remaining = [name for name in JD_SECTIONS if name not in results]
+    calls = _split_jd_calls(text, remaining)
+    outcomes = await asyncio.gather(*(start() for start in calls.values()), return_exceptions=True)
+    for name, outcome in zip(remaining, outcomes):
+        if isinstance(outcome, HTTPException):
+            errors[name] = outcome.detail
+        elif isinstance(outcome, Exception):
+            errors[name] = str(outcome)
+        else:
+            results[name] = outcome
+    results = {name: results[name] for name in JD_SECTIONS if name in results}
+    return {"results": results, "errors": errors}
+
+@jd_router.post("/all")
+async def parse_jd_all(file: UploadFile = File(...), mode: str = PARSE_MODE):
+    if mode not in PARSE_MODES:
+        raise HTTPException(400, f"mode must be one of {', '.join(PARSE_MODES)}")
+    text = await extract_text(file)
+    if not text.strip():
+        raise HTTPException(400, "Empty file content")
+    result = await parse_jd_profile(text, mode)
+    return JSONResponse(content=result)
+
+# Same sections as /all, each streamed as soon as it is extracted (see streaming)
+@jd_router.post("/stream")
+async def parse_jd_stream(file: UploadFile = File(...), mode: str = PARSE_MODE,
+                          stream_format: str = Query("sse", alias="format"), items: bool = True):
+    if mode not in PARSE_MODES:
+        raise HTTPException(400, f"mode must be one of {', '.join(PARSE_MODES)}")
+    check_format(stream_format)
+    text = await extract_text(file)
+    if not text.strip():
+        raise HTTPException(400, "Empty file content")
+
+    async def events():
+        ready = await _combined_jd_sections(text, mode)
+        pending = _split_jd_calls(text, [name for name in JD_SECTIONS if name not in ready])
+        async for event in iter_sections(ready, pending, items):
+            yield event
+
+    return stream_response(events(), stream_format)
@@ -0,0 +1,236 @@
+import os
+import json
+import random
+import asyncio
+from types import SimpleNamespace
+import httpx
+import openai
+from openai import AsyncOpenAI
+from dotenv import load_dotenv
+
+import token_budget
+from schema_tools import sample_result
+
+load_dotenv()
+
+# Completion backends for llm_client. LLM_BACKEND picks one:
+#   openai  real chat completions (default)
+#   fake    local stand-in returning schema-conformant JSON, for offline
+#           load tests and benchmarks; tune with FAKE_LLM_LATENCY_MS,
+#           FAKE_LLM_JITTER_MS, FAKE_LLM_ERROR_RATE, FAKE_LLM_ERROR_STATUS,
+#           FAKE_LLM_INVALID_RATE (share of schema-invalid outputs) and FAKE_LLM_SEED
+LLM_BACKEND = os.getenv("LLM_BACKEND", "openai")
+
+# Streamed fake completions: share of the latency before the first chunk, and
+# characters of function-call arguments per chunk
+FAKE_FIRST_CHUNK_SHARE = 0.2
+FAKE_CHUNK_CHARS = 16
+
+# Connection pool of the shared HTTP client behind the openai backend. Every
+# parser call goes through this one pool, so bursts reuse warm keep-alive
+# connections instead of paying a TCP + TLS handshake each. LLM_HTTP2=1
+# multiplexes concurrent completions over fewer connections when the h2
+# package is installed (HTTP/1.1 otherwise).
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "100"))
+LLM_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "20"))
+LLM_KEEPALIVE_EXPIRY = float(os.getenv("LLM_KEEPALIVE_EXPIRY", "60"))  # seconds an idle connection is kept
+LLM_HTTP2 = os.getenv("LLM_HTTP2", "1") == "1"
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "600"))  # seconds, the SDK's own default
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "5"))
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class OpenAIBackend:
+    def __init__(self):
+        self.http2 = LLM_HTTP2 and _http2_available()
+        # Handshake and request counters fed by httpcore trace events
+        self.counters = {"requests": 0, "tcp_connects": 0, "tls_handshakes": 0, "http2_requests": 0}
+        self.transport = httpx.AsyncHTTPTransport(
+            http2=self.http2,
+            limits=httpx.Limits(
+                max_connections=LLM_MAX_CONNECTIONS,
+                max_keepalive_connections=LLM_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=LLM_KEEPALIVE_EXPIRY,
+            ),
+        )
+        self.http_client = httpx.AsyncClient(
+            transport=self.transport,
+            timeout=httpx.Timeout(LLM_TIMEOUT, connect=LLM_CONNECT_TIMEOUT),
+            event_hooks={"request": [self._attach_trace]},
+        )
+        # OPENAI_BASE_URL (read by the SDK) can point this at a local stand-in server.
+        # Retries are left to llm_scheduler, which knows about rate limits and lanes.
+        self.client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), http_client=self.http_client, max_retries=0)
+
+    async def _attach_trace(self, request: httpx.Request):
+        self.counters["requests"] += 1
+        request.extensions["trace"] = self._trace
+
+    async def _trace(self, event: str, info: dict):
+        if event == "connection.connect_tcp.complete":
+            self.counters["tcp_connects"] += 1
+        elif event == "connection.start_tls.complete":
+            self.counters["tls_handshakes"] += 1
+        elif event == "http2.send_request_headers.started":
+            self.counters["http2_requests"] += 1
+
+    def stats(self) -> dict:
+        # httpx does not expose its connection pool; httpcore's pool (reached
+        # through the transport) lists the open connections
+        pool = getattr(self.transport, "_pool", None)
+        connections = list(pool.connections) if pool is not None else []
+        idle = sum(1 for connection in connections if connection.is_idle())
+        return {
+            "http2": self.http2,
+            "max_connections": LLM_MAX_CONNECTIONS,
+            "max_keepalive_connections": LLM_MAX_KEEPALIVE_CONNECTIONS,
+            "open_connections": len(connections),
+            "idle_connections": idle,
+            "active_connections": len(connections) - idle,
+            **self.counters,
+        }
+
+    async def create(self, **kwargs):
+        return await self.client.chat.completions.create(**kwargs)
+
+    async def aclose(self):
+        await self.http_client.aclose()
+
+
+class FakeBackend:
+    def __init__(self, latency_ms: float = 200, jitter_ms: float = 0, error_rate: float = 0,
+                 error_status: int = 500, seed=None, invalid_rate: float = 0):
+        self.latency_ms = latency_ms
+        self.invalid_rate = invalid_rate
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.calls = 0
+        self._rng = random.Random(seed)
+
+    def _error(self):
+        response = httpx.Response(
+            self.error_status,
+            request=httpx.Request("POST", "http://fake-llm.local/v1/chat/completions"),
+            json={"error": {"message": "fake backend error"}},
+        )
+        if self.error_status == 429:
+            return openai.RateLimitError("fake backend rate limit", response=response, body=None)
+        if self.error_status >= 500:
+            return openai.InternalServerError("fake backend error", response=response, body=None)
+        return openai.APIStatusError("fake backend error", response=response, body=None)
+
+    # Arguments for one function call; with invalid_rate, some leave out a
+    # required property so callers' schema validation and repair can be exercised
+    def _arguments(self, schema: dict) -> str:
+        result = sample_result(schema)
+        required = schema["parameters"].get("required")
+        if self.invalid_rate and required and self._rng.random() < self.invalid_rate:
+            result.pop(required[0], None)
+        return json.dumps(result)
+
+    def _usage(self, messages: list, schemas: list, outputs: list):
+        prompt_tokens = token_budget.estimate_prompt_tokens(
+            "".join(message["content"] for message in messages), schemas, ""
+        )
+        completion_tokens = sum(token_budget.count_tokens(output) for output in outputs)
+        return SimpleNamespace(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            total_tokens=prompt_tokens + completion_tokens,
+            prompt_tokens_details=SimpleNamespace(cached_tokens=0),
+        )
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        delay = max(self.latency_ms + self._rng.uniform(-self.jitter_ms, self.jitter_ms), 0) / 1000
+        if kwargs.get("stream"):
+            # the first chunk arrives after a fifth of the latency, the rest is spread over the chunks
+            await asyncio.sleep(delay * FAKE_FIRST_CHUNK_SHARE)
+        else:
+            await asyncio.sleep(delay)
+        if self.error_rate and self._rng.random() < self.error_rate:
+            raise self._error()
+        if kwargs.get("stream"):
+            return self._stream(kwargs, delay * (1 - FAKE_FIRST_CHUNK_SHARE))
+
+        if "tools" in kwargs:
+            schemas = [tool["function"] for tool in kwargs["tools"]]
+            outputs = [self._arguments(schema) for schema in schemas]
+            message = SimpleNamespace(
+                content=None,
+                function_call=None,
+                tool_calls=[
+                    SimpleNamespace(
+                        id=f"call_{index}", type="function",
+                        function=SimpleNamespace(name=schema["name"], arguments=output),
+                    )
+                    for index, (schema, output) in enumerate(zip(schemas, outputs))
+                ],
+            )
+        else:
+            schemas = kwargs["functions"]
+            outputs = [self._arguments(schemas[0])]
+            message = SimpleNamespace(
+                content=None,
+                tool_calls=None,
+                function_call=SimpleNamespace(name=schemas[0]["name"], arguments=outputs[0]),
+            )
+        return SimpleNamespace(
+            model=kwargs.get("model"),
+            choices=[SimpleNamespace(index=0, message=message, finish_reason="stop")],
+            usage=self._usage(kwargs["messages"], schemas, outputs),
+        )
+
+    # Chunks shaped like the SDK's ChatCompletionChunk for a streamed function
+    # call; usage comes on a final chunk with no choices (stream_options.include_usage)
+    async def _stream(self, kwargs: dict, duration: float):
+        schema = kwargs["functions"][0]
+        output = self._arguments(schema)
+        pieces = [output[i:i + FAKE_CHUNK_CHARS] for i in range(0, len(output), FAKE_CHUNK_CHARS)]
+        for index, piece in enumerate(pieces):
+            if index:
+                await asyncio.sleep(duration / len(pieces))
+            delta = SimpleNamespace(
+                role="assistant" if index == 0 else None,
+                content=None,
+                tool_calls=None,
+                function_call=SimpleNamespace(name=schema["name"] if index == 0 else None, arguments=piece),
+            )
+            yield SimpleNamespace(
+                model=kwargs.get("model"),
+                choices=[SimpleNamespace(index=0, delta=delta, finish_reason=None)],
+                usage=None,
+            )
+        if (kwargs.get("stream_options") or {}).get("include_usage"):
+            yield SimpleNamespace(
+                model=kwargs.get("model"),
+                choices=[],
+                usage=self._usage(kwargs["messages"], [schema], [output]),
+            )
+
+    async def aclose(self):
+        pass
+
+
+def create_backend(name: str = LLM_BACKEND):
+    if name == "fake":
+        seed = os.getenv("FAKE_LLM_SEED")
+        return FakeBackend(
+            latency_ms=float(os.getenv("FAKE_LLM_LATENCY_MS", "200")),
+            jitter_ms=float(os.getenv("FAKE_LLM_JITTER_MS", "0")),
+            error_rate=float(os.getenv("FAKE_LLM_ERROR_RATE", "0")),
+            error_status=int(os.getenv("FAKE_LLM_ERROR_STATUS", "500")),
+            seed=int(seed) if seed else None,
+            invalid_rate=float(os.getenv("FAKE_LLM_INVALID_RATE", "0")),
+        )
+    if name == "openai":
+        return OpenAIBackend()
+    raise RuntimeError(f"Unknown LLM_BACKEND {name!r}; expected 'openai' or 'fake'")
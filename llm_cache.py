@@ -0,0 +1,99 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Persistent cache for extraction results, keyed on a hash of
+# (extracted text, system prompt, function schema, model).
+# LLM_CACHE_PATH="" turns the cache off.
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "llm_cache.sqlite3")
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))  # seconds, 0 = no expiry
+
+
+def make_key(text: str, system_prompt: str, function_schema: dict, model: str) -> str:
+    digest = hashlib.sha256()
+    for part in (text, system_prompt, json.dumps(function_schema, sort_keys=True), model):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class LLMCache:
+    # SQLite-backed store with TTL expiry and least-recently-used eviction.
+    # Hits only note their access time in memory; the times are written with
+    # the next set(), just before eviction needs them, so a hit costs no write.
+    def __init__(self, path: str, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._touched = {}  # key -> last access not yet written
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "created_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS llm_cache_lru ON llm_cache (last_access)")
+        self._db.commit()
+
+    def get(self, key: str):
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row and self.ttl and now - row[1] > self.ttl:
+                self._db.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._db.commit()
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._touched[key] = now
+            self.hits += 1
+            return json.loads(row[0])
+
+    def set(self, key: str, value: dict):
+        now = time.time()
+        with self._lock:
+            if self._touched:
+                self._db.executemany(
+                    "UPDATE llm_cache SET last_access = ? WHERE key = ?",
+                    [(accessed, touched) for touched, accessed in self._touched.items()]
+                )
+                self._touched.clear()
+            self._db.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, created_at, last_access) "
+                "VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now, now)
+            )
+            if self.ttl:
+                self._db.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl,))
+            self._db.execute(
+                "DELETE FROM llm_cache WHERE key IN ("
+                "SELECT key FROM llm_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self._db.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+        }
+
+
+cache = LLMCache(LLM_CACHE_PATH, LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTL) if LLM_CACHE_PATH else None
@@ -0,0 +1,381 @@
+import os
+import json
+import asyncio
+from types import SimpleNamespace
+from dotenv import load_dotenv
+
+import llm_cache
+import llm_backends
+import token_budget
+import sap_vocab
+import deployment_rules
+import metrics
+import schema_validation
+from incremental_json import IncrementalJSONParser
+import llm_scheduler
+
+load_dotenv()
+
+MODEL = "gpt-4o-2024-08-06"
+
+# Shared async completion backend for resume_parser and jd_parser, selected
+# by LLM_BACKEND (see llm_backends)
+backend = llm_backends.create_backend()
+
+# "split" sends one completion per schema; "combined" packs every schema of a
+# multi-section parse into one tools-enabled completion when it fits within
+# COMBINED_MAX_PROMPT_TOKENS, and falls back to split calls otherwise.
+PARSE_MODE = os.getenv("PARSE_MODE", "split")
+PARSE_MODES = ("split", "combined")
+COMBINED_MAX_PROMPT_TOKENS = int(os.getenv("COMBINED_MAX_PROMPT_TOKENS", "60000"))
+
+# Extra completions allowed to repair output that fails its schema
+LLM_REPAIR_ATTEMPTS = int(os.getenv("LLM_REPAIR_ATTEMPTS", "1"))
+
+# Running token totals per mode, used to compare split vs combined cost.
+# cached_prompt_tokens counts prompt tokens served from the provider's prefix cache.
+token_usage = {
+    mode: {"calls": 0, "prompt_tokens": 0, "cached_prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+    for mode in PARSE_MODES
+}
+
+
+def _record_usage(mode: str, usage):
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = (getattr(details, "cached_tokens", None) or 0) if details else 0
+    totals = token_usage[mode]
+    totals["calls"] += 1
+    totals["prompt_tokens"] += usage.prompt_tokens
+    totals["cached_prompt_tokens"] += cached
+    totals["completion_tokens"] += usage.completion_tokens
+    totals["total_tokens"] += usage.total_tokens
+
+
+# Request layout for provider-side prefix caching: the functions/tools and the
+# static system prompt (instructions + reference JSON) come first and are
+# byte-identical on every call for a given schema; the document text goes last.
+# prompt_cache_key routes calls sharing that prefix to the same cache.
+def build_messages(system_prompt: str, text: str) -> list:
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": text}
+    ]
+
+
+# Deterministic extractors tried before the model; each returns a result or None.
+# They scan the whole text (tens of ms on a long document), so callers run them
+# in a thread rather than on the event loop.
+LOCAL_EXTRACTORS = (sap_vocab.prescreen, deployment_rules.fast_path)
+
+
+def _local_result(text: str, function_schema: dict):
+    for extractor in LOCAL_EXTRACTORS:
+        result = extractor(text, function_schema)
+        if result is not None:
+            return result
+    return None
+
+
+# SQLite work runs in a thread so cache lookups never block the event loop
+async def _cache_get(key: str):
+    return await asyncio.to_thread(llm_cache.cache.get, key) if llm_cache.cache is not None else None
+
+
+async def _cache_set(key: str, result: dict):
+    if llm_cache.cache is not None:
+        await asyncio.to_thread(llm_cache.cache.set, key, result)
+
+
+# Run one forced function-call completion and return the decoded arguments.
+# Awaiting the async backend keeps a slow completion from stalling the event loop.
+# Results are served from llm_cache when the same request was seen before, and
+# concurrent identical requests share one completion. Every result returned is
+# checked against the schema's compiled validator (schema_validation).
+# Raises token_budget.PromptTooLarge before dispatch when the input is over budget.
+# LOCAL_EXTRACTORS answer without the model when they can: phases with no SAP
+# vocabulary signal (sap_vocab) and confidently rule-matched deployment context
+# (deployment_rules).
+# on_item(path, item), when given, streams the completion and is called with
+# each array item of the arguments as soon as the model has finished writing
+# it (see incremental_json); the return value is the same either way.
+async def call_function(text: str, system_prompt: str, function_schema: dict, on_item=None) -> dict:
+    local = await asyncio.to_thread(_local_result, text, function_schema)
+    if local is not None and not schema_validation.validate(function_schema, local):
+        metrics.inc("resumeparser_results_total", source="local", schema=function_schema["name"])
+        return local
+    with metrics.span("prompt_build"):
+        text = token_budget.fit_text(system_prompt, function_schema, text)
+        key = llm_cache.make_key(text, system_prompt, function_schema, MODEL)
+    cached = await _cache_get(key)
+    if cached is not None and not schema_validation.validate(function_schema, cached):
+        metrics.inc("resumeparser_results_total", source="cache", schema=function_schema["name"])
+        return cached
+
+    # Single flight: identical requests arriving while one is in flight await
+    # the same completion. Shielded, so a caller that disconnects does not
+    # cancel the completion for the others; once every caller has gone, the
+    # completion is cancelled.
+    flight = _in_flight.get(key)
+    if flight is not None:
+        metrics.inc("resumeparser_results_total", source="coalesced", schema=function_schema["name"])
+        return await flight.wait(on_item)
+    flight = _in_flight[key] = _Flight(key)
+    flight.task = asyncio.ensure_future(_complete_and_cache(
+        key, text, system_prompt, function_schema, flight.on_item if on_item is not None else None
+    ))
+    flight.task.add_done_callback(lambda _: flight.leave())
+    return await flight.wait(on_item)
+
+
+# One completion shared by every identical request waiting on it. Array items
+# are fanned out to each waiter's on_item, with the items seen so far replayed
+# to late joiners. Items only exist when the completion streams, which the
+# caller that started it decides by passing on_item.
+class _Flight:
+    def __init__(self, key: str):
+        self.key = key
+        self.task = None
+        self.waiters = 0
+        self.items = []
+        self.listeners = []
+
+    def on_item(self, path: tuple, item):
+        self.items.append((path, item))
+        for listener in list(self.listeners):
+            listener(path, item)
+
+    # Stop offering this completion to new callers
+    def leave(self):
+        if _in_flight.get(self.key) is self:
+            del _in_flight[self.key]
+
+    async def wait(self, on_item=None) -> dict:
+        if on_item is not None:
+            for path, item in self.items:
+                on_item(path, item)
+            self.listeners.append(on_item)
+        self.waiters += 1
+        try:
+            return await asyncio.shield(self.task)
+        finally:
+            self.waiters -= 1
+            if on_item is not None:
+                self.listeners.remove(on_item)
+            if not self.waiters and not self.task.done():
+                # every caller was cancelled (e.g. a streaming client went away)
+                self.leave()
+                self.task.cancel()
+
+
+# Cache key -> _Flight of the completion currently running for it
+_in_flight = {}
+
+
+# Output that fails its schema (or is not JSON at all) is sent back to the
+# model with the errors, at most LLM_REPAIR_ATTEMPTS times, before the call
+# fails with schema_validation.InvalidModelOutput. Only valid results are cached.
+async def _complete_and_cache(key: str, text: str, system_prompt: str, function_schema: dict,
+                              on_item=None) -> dict:
+    name = function_schema["name"]
+    with metrics.span("prompt_build"):
+        messages = build_messages(system_prompt, text)
+    for attempt in range(LLM_REPAIR_ATTEMPTS + 1):
+        # items are only streamed from the first attempt
+        args = await _request_arguments(messages, function_schema, on_item if attempt == 0 else None)
+        result, errors = _decode_and_validate(function_schema, args)
+        if not errors:
+            break
+        messages = messages + [_repair_message(name, args, errors)]
+    else:
+        metrics.inc("resumeparser_invalid_outputs_total", schema=name, outcome="rejected")
+        raise schema_validation.InvalidModelOutput(name, errors)
+    if attempt:
+        metrics.inc("resumeparser_invalid_outputs_total", attempt, schema=name, outcome="repaired")
+    metrics.inc("resumeparser_results_total", source="model", schema=name)
+    await _cache_set(key, result)
+    return result
+
+
+def _decode_and_validate(function_schema: dict, args) -> tuple:
+    if args is None:
+        return None, ["no function call in response"]
+    try:
+        with metrics.span("json_decode"):
+            result = json.loads(args)
+    except json.JSONDecodeError as e:
+        return None, [f"arguments are not valid JSON: {e}"]
+    return result, schema_validation.validate(function_schema, result)
+
+
+def _repair_message(function_name: str, args, errors: list) -> dict:
+    listed = "\n".join(f"- {error}" for error in errors)
+    return {"role": "user", "content": (
+        f"Your previous call to `{function_name}` was invalid:\n{listed}\n"
+        f"Previous arguments:\n{args or '(none)'}\n"
+        f"Call `{function_name}` again with arguments that follow its schema exactly."
+    )}
+
+
+# consume(resp), when given, reads a streamed response inside the model_call span
+async def _send(consume=None, **kwargs):
+    metrics.inc("resumeparser_llm_in_flight")
+    try:
+        with metrics.span("model_call"):
+            resp = await backend.create(**kwargs)
+            return await consume(resp) if consume is not None else resp
+    finally:
+        metrics.dec("resumeparser_llm_in_flight")
+
+
+# Dispatch through llm_scheduler: rate-limit admission, priority lane, retries.
+# A stream that fails midway is retried from the start, so on_item callers may
+# see an item twice; the returned result is authoritative.
+async def _create(schemas: list, consume=None, **kwargs):
+    def estimate_tokens():
+        system_prompt = kwargs["messages"][0]["content"]
+        text = "".join(message["content"] for message in kwargs["messages"][1:])
+        return token_budget.estimate_prompt_tokens(system_prompt, schemas, text)
+
+    return await llm_scheduler.scheduler.submit(lambda: _send(consume, **kwargs), estimate_tokens)
+
+
+# Read a streamed function call into the same shape as a non-streamed
+# response, passing completed array items to on_item along the way
+def _stream_consumer(on_item):
+    async def consume(stream) -> SimpleNamespace:
+        parser = IncrementalJSONParser()
+        name, usage, parts = None, None, []
+        async for chunk in stream:
+            if chunk.usage is not None:
+                usage = chunk.usage
+            for choice in chunk.choices:
+                function_call = choice.delta.function_call
+                if function_call is None:
+                    continue
+                name = name or function_call.name
+                parts.append(function_call.arguments or "")
+                if parser is None:
+                    continue
+                try:
+                    items = parser.feed(parts[-1])
+                except (IndexError, ValueError):
+                    # Malformed arguments: stop streaming items and keep collecting
+                    # the text, so decoding and the repair loop deal with it
+                    parser = None
+                    continue
+                for path, item in items:
+                    on_item(path, item)
+        function_call = SimpleNamespace(name=name, arguments="".join(parts)) if name else None
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(function_call=function_call, tool_calls=None))],
+            usage=usage,
+        )
+
+    return consume
+
+
+# One completion; returns the raw function-call arguments (None if the model
+# did not call the function)
+async def _request_arguments(messages: list, function_schema: dict, on_item=None):
+    stream = {} if on_item is None else {"stream": True, "stream_options": {"include_usage": True}}
+    resp = await _create(
+        [function_schema],
+        _stream_consumer(on_item) if on_item is not None else None,
+        model=MODEL,
+        messages=messages,
+        functions=[function_schema],
+        function_call={"name": function_schema["name"]},
+        prompt_cache_key=function_schema["name"],
+        **stream
+    )
+    if resp.usage is not None:
+        _record_usage("split", resp.usage)
+        metrics.record_tokens(function_schema["name"], "split", resp.usage)
+
+    function_call = resp.choices[0].message.function_call
+    return function_call.arguments if function_call else None
+
+
+# Single completion without validation or repair, decoded (used by benchmarks)
+async def _complete(text: str, system_prompt: str, function_schema: dict, on_item=None) -> dict:
+    with metrics.span("prompt_build"):
+        messages = build_messages(system_prompt, text)
+    args = await _request_arguments(messages, function_schema, on_item)
+    if args is None:
+        raise ValueError("No function call in response")
+    with metrics.span("json_decode"):
+        return json.loads(args)
+
+
+COMBINED_SYSTEM_PROMPT = """
+You extract several independent sections from the same document.
+Call every provided function exactly once. Each function has its own instructions below;
+apply only that function's instructions when filling in its arguments.
+"""
+
+
+def _combined_prompt(phases: dict) -> str:
+    parts = [COMBINED_SYSTEM_PROMPT]
+    for system_prompt, function_schema in phases.values():
+        parts.append(f"\n### Instructions for function `{function_schema['name']}`\n{system_prompt}")
+    return "".join(parts)
+
+
+# Extract several sections with one tools-enabled completion, so the document
+# is sent (and tokenized) once instead of once per schema.
+# phases maps section name -> (system prompt, function schema). Returns the
+# sections it could resolve; callers run split calls for anything missing.
+# Returns {} without calling the model when the packed prompt is over budget.
+async def call_functions_combined(text: str, phases: dict) -> dict:
+    results = {}
+    keys = {}
+    for name, (system_prompt, function_schema) in phases.items():
+        local = await asyncio.to_thread(_local_result, text, function_schema)
+        if local is not None and not schema_validation.validate(function_schema, local):
+            metrics.inc("resumeparser_results_total", source="local", schema=function_schema["name"])
+            results[name] = local
+            continue
+        keys[name] = llm_cache.make_key(text, system_prompt, function_schema, MODEL)
+        cached = await _cache_get(keys[name])
+        if cached is not None and not schema_validation.validate(function_schema, cached):
+            metrics.inc("resumeparser_results_total", source="cache", schema=function_schema["name"])
+            results[name] = cached
+    todo = {name: phase for name, phase in phases.items() if name not in results}
+    if len(todo) < 2:
+        return results
+
+    with metrics.span("prompt_build"):
+        system_prompt = _combined_prompt(todo)
+        schemas = [function_schema for _, function_schema in todo.values()]
+        prompt_tokens = token_budget.estimate_prompt_tokens(system_prompt, schemas, text)
+        messages = build_messages(system_prompt, text)
+    if prompt_tokens > min(COMBINED_MAX_PROMPT_TOKENS, token_budget.MAX_PROMPT_TOKENS):
+        return results
+
+    cache_key = "combined:" + ",".join(function_schema["name"] for function_schema in schemas)
+    resp = await _create(
+        schemas,
+        model=MODEL,
+        messages=messages,
+        tools=[{"type": "function", "function": function_schema} for function_schema in schemas],
+        tool_choice="required",
+        parallel_tool_calls=True,
+        prompt_cache_key=cache_key
+    )
+    _record_usage("combined", resp.usage)
+    metrics.record_tokens(cache_key, "combined", resp.usage)
+
+    by_function = {function_schema["name"]: name for name, (_, function_schema) in todo.items()}
+    for tool_call in resp.choices[0].message.tool_calls or []:
+        name = by_function.get(tool_call.function.name)
+        if name is None or name in results:
+            continue
+        # invalid sections are left out and get their own (repairable) split call
+        result, errors = _decode_and_validate(todo[name][1], tool_call.function.arguments)
+        if errors:
+            metrics.inc("resumeparser_invalid_outputs_total", schema=tool_call.function.name, outcome="split_retry")
+            continue
+        results[name] = result
+        metrics.inc("resumeparser_results_total", source="model", schema=tool_call.function.name)
+        await _cache_set(keys[name], results[name])
+    return results
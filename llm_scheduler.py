@@ -0,0 +1,158 @@
+import os
+import time
+import heapq
+import random
+import asyncio
+import itertools
+import contextvars
+import openai
+from dotenv import load_dotenv
+
+import metrics
+
+load_dotenv()
+
+# Client-side admission and retry for model calls. Every completion waits for
+# room in two token buckets (requests/min and tokens/min, 0 = unlimited), with
+# interactive requests admitted ahead of batch work; retryable failures (429,
+# 5xx, timeouts, dropped connections) are retried with jittered exponential
+# backoff, honouring Retry-After when the provider sends one.
+LLM_RPM = float(os.getenv("LLM_RPM", "0"))
+LLM_TPM = float(os.getenv("LLM_TPM", "0"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+LLM_RETRY_BASE_DELAY = float(os.getenv("LLM_RETRY_BASE_DELAY", "0.5"))  # seconds
+LLM_RETRY_MAX_DELAY = float(os.getenv("LLM_RETRY_MAX_DELAY", "20"))     # seconds
+
+# Lower value = admitted first
+LANES = {"interactive": 0, "batch": 1}
+
+# Lane of the work being done; batch workers and the bulk CLI set "batch"
+current_lane = contextvars.ContextVar("llm_lane", default="interactive")
+
+RETRYABLE = (openai.RateLimitError, openai.APITimeoutError, openai.APIConnectionError, openai.InternalServerError)
+
+
+class TokenBucket:
+    # Refills continuously at rate_per_minute, holding at most one minute's worth
+    def __init__(self, rate_per_minute: float):
+        self.capacity = rate_per_minute
+        self.rate = rate_per_minute / 60
+        self.level = rate_per_minute
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    # Seconds until amount is available (0 = available now)
+    def wait_time(self, amount: float) -> float:
+        self._refill()
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def take(self, amount: float):
+        self._refill()
+        self.level -= amount
+
+    # Correct a reservation once the real cost is known (level may go negative)
+    def adjust(self, amount: float):
+        self._refill()
+        self.level = min(self.capacity, self.level - amount)
+
+
+def retry_delay(attempt: int, error: Exception) -> float:
+    delay = random.uniform(0, min(LLM_RETRY_MAX_DELAY, LLM_RETRY_BASE_DELAY * 2 ** attempt))
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    if retry_after:
+        try:
+            delay = max(delay, min(float(retry_after), LLM_RETRY_MAX_DELAY))
+        except ValueError:
+            pass
+    return delay
+
+
+class Scheduler:
+    def __init__(self, rpm: float = 0, tpm: float = 0, max_retries: int = 3):
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.max_retries = max_retries
+        self._waiting = []  # heap of (lane priority, arrival) for calls not yet admitted
+        self._arrivals = itertools.count()
+        self._changed = None
+
+    @property
+    def limited(self) -> bool:
+        return self.requests is not None or self.tokens is not None
+
+    def depth(self) -> dict:
+        depth = {lane: 0 for lane in LANES}
+        names = {priority: lane for lane, priority in LANES.items()}
+        for priority, _ in self._waiting:
+            depth[names[priority]] += 1
+        return depth
+
+    def _wait_time(self, tokens: int) -> float:
+        waits = [0.0]
+        if self.requests is not None:
+            waits.append(self.requests.wait_time(1))
+        if self.tokens is not None:
+            waits.append(self.tokens.wait_time(tokens))
+        return max(waits)
+
+    # Wait until this call is first in line and both buckets have room
+    async def _admit(self, tokens: int, lane: str):
+        if self._changed is None:
+            self._changed = asyncio.Condition()
+        entry = (LANES[lane], next(self._arrivals))
+        heapq.heappush(self._waiting, entry)
+        metrics.inc("resumeparser_llm_queue_depth", lane=lane)
+        began = time.perf_counter()
+        try:
+            async with self._changed:
+                while True:
+                    wait = self._wait_time(tokens) if self._waiting[0] == entry else None
+                    if wait == 0:
+                        break
+                    try:
+                        await asyncio.wait_for(self._changed.wait(), wait)
+                    except asyncio.TimeoutError:
+                        pass
+                if self.requests is not None:
+                    self.requests.take(1)
+                if self.tokens is not None:
+                    self.tokens.take(tokens)
+        finally:
+            self._waiting.remove(entry)
+            heapq.heapify(self._waiting)
+            metrics.dec("resumeparser_llm_queue_depth", lane=lane)
+            metrics.observe("resumeparser_llm_queue_wait_seconds", time.perf_counter() - began, lane=lane)
+            async with self._changed:
+                self._changed.notify_all()
+
+    # Run make_call() (a fresh coroutine per attempt) once admitted, retrying
+    # retryable errors. estimate_tokens() is only evaluated when a tokens/min
+    # limit is set; the bucket is corrected with the usage the response reports.
+    async def submit(self, make_call, estimate_tokens=lambda: 0):
+        lane = current_lane.get()
+        tokens = estimate_tokens() if self.tokens is not None else 0
+        for attempt in range(self.max_retries + 1):
+            if self.limited:
+                await self._admit(tokens, lane)
+            try:
+                resp = await make_call()
+            except RETRYABLE as e:
+                if attempt == self.max_retries:
+                    raise
+                status = getattr(e, "status_code", None) or type(e).__name__
+                metrics.inc("resumeparser_llm_retries_total", reason=str(status), lane=lane)
+                await asyncio.sleep(retry_delay(attempt, e))
+                continue
+            usage = getattr(resp, "usage", None)
+            if self.tokens is not None and usage is not None:
+                self.tokens.adjust(usage.total_tokens - tokens)
+            return resp
+
+
+scheduler = Scheduler(LLM_RPM, LLM_TPM, LLM_MAX_RETRIES)
@@ -0,0 +1,142 @@
+import time
+import threading
+import contextvars
+from contextlib import contextmanager
+
+# In-process metrics rendered in the Prometheus text format by GET /metrics.
+# Request handling runs on one event loop, but batch workers and the PDF pool
+# callbacks may touch the registry from other threads, hence the lock.
+
+# Route template of the request being served ("background" for batch workers)
+current_endpoint = contextvars.ContextVar("current_endpoint", default="background")
+
+# Seconds; covers a cached lookup (sub-ms) up to a slow multi-page completion
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+HELP = {
+    "resumeparser_requests_total": ("counter", "HTTP requests by route template and status code"),
+    "resumeparser_request_seconds": ("histogram", "HTTP request latency by route template"),
+    "resumeparser_requests_in_flight": ("gauge", "HTTP requests currently being served"),
+    "resumeparser_stage_seconds": ("histogram", "Time spent per request stage"),
+    "resumeparser_llm_calls_total": ("counter", "Completions sent to the model by endpoint, schema and mode"),
+    "resumeparser_llm_tokens_total": ("counter", "Model tokens by endpoint, schema and kind"),
+    "resumeparser_llm_in_flight": ("gauge", "Completions currently awaiting the model"),
+    "resumeparser_llm_queue_depth": ("gauge", "Model calls waiting for rate-limit admission, by lane"),
+    "resumeparser_llm_queue_wait_seconds": ("histogram", "Time model calls waited for admission, by lane"),
+    "resumeparser_llm_retries_total": ("counter", "Model calls retried, by error status and lane"),
+    "resumeparser_invalid_outputs_total": ("counter", "Model outputs that failed schema validation, by outcome"),
+    "resumeparser_results_total": ("counter", "Extraction results by where they came from"),
+    "resumeparser_pdf_page_seconds": ("histogram", "Time to decode one PDF page, by extractor"),
+    "resumeparser_pdf_truncated_total": ("counter", "PDFs cut off at PDF_MAX_CHARS, by extractor"),
+    "resumeparser_combined_fallbacks_total": ("counter", "Combined parses that failed and fell back to split calls"),
+    "resumeparser_cache_hits_total": ("counter", "Cache hits"),
+    "resumeparser_cache_misses_total": ("counter", "Cache misses"),
+    "resumeparser_cache_hit_ratio": ("gauge", "Cache hits over lookups since start"),
+    "resumeparser_llm_http_connections": ("gauge", "Open connections in the model client pool"),
+    "resumeparser_llm_http_requests_total": ("counter", "HTTP requests sent by the model client"),
+    "resumeparser_llm_http_tcp_connects_total": ("counter", "TCP connections opened by the model client"),
+    "resumeparser_llm_http_tls_handshakes_total": ("counter", "TLS handshakes done by the model client"),
+    "resumeparser_llm_http_http2_requests_total": ("counter", "Model client requests sent over HTTP/2"),
+}
+
+_lock = threading.Lock()
+_values = {}      # (name, labels) -> float, for counters and gauges
+_histograms = {}  # (name, labels) -> [bucket counts..., sum, count]
+
+# Callables returning [(name, labels dict, value)] evaluated at scrape time,
+# for numbers owned by other modules (cache stats)
+collectors = []
+
+
+def _key(name: str, labels: dict) -> tuple:
+    return name, tuple(sorted(labels.items()))
+
+
+def inc(name: str, amount: float = 1, **labels):
+    key = _key(name, labels)
+    with _lock:
+        _values[key] = _values.get(key, 0) + amount
+
+
+def dec(name: str, amount: float = 1, **labels):
+    inc(name, -amount, **labels)
+
+
+def observe(name: str, value: float, **labels):
+    key = _key(name, labels)
+    with _lock:
+        series = _histograms.get(key)
+        if series is None:
+            series = _histograms[key] = [0] * (len(BUCKETS) + 2)
+        for index, bound in enumerate(BUCKETS):
+            if value <= bound:
+                series[index] += 1
+        series[-2] += value
+        series[-1] += 1
+
+
+# Time a stage of the current request: upload_read, text_extract, prompt_build,
+# model_call, json_decode or validate
+@contextmanager
+def span(stage: str, **labels):
+    began = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe("resumeparser_stage_seconds", time.perf_counter() - began,
+                endpoint=current_endpoint.get(), stage=stage, **labels)
+
+
+def record_tokens(schema: str, mode: str, usage):
+    endpoint = current_endpoint.get()
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = (getattr(details, "cached_tokens", None) or 0) if details else 0
+    inc("resumeparser_llm_calls_total", endpoint=endpoint, schema=schema, mode=mode)
+    for kind, count in (("prompt", usage.prompt_tokens), ("cached_prompt", cached),
+                        ("completion", usage.completion_tokens)):
+        inc("resumeparser_llm_tokens_total", count, endpoint=endpoint, schema=schema, kind=kind)
+
+
+def _labels(labels) -> str:
+    if not labels:
+        return ""
+    pairs = []
+    for name, value in labels:
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _format(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def render() -> str:
+    with _lock:
+        values = dict(_values)
+        histograms = {key: list(series) for key, series in _histograms.items()}
+    for collect in collectors:
+        for name, labels, value in collect():
+            values[_key(name, labels)] = value
+
+    by_name = {}
+    for (name, labels), value in values.items():
+        by_name.setdefault(name, []).append((labels, value))
+    for (name, labels), series in histograms.items():
+        by_name.setdefault(name, []).append((labels, series))
+
+    lines = []
+    for name in sorted(by_name):
+        kind, description = HELP.get(name, ("untyped", name))
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in sorted(by_name[name], key=lambda item: item[0]):
+            if kind != "histogram":
+                lines.append(f"{name}{_labels(labels)} {_format(value)}")
+                continue
+            for bound, count in zip(BUCKETS, value):
+                lines.append(f"{name}_bucket{_labels(labels + (('le', repr(bound)),))} {count}")
+            lines.append(f"{name}_bucket{_labels(labels + (('le', '+Inf'),))} {value[-1]}")
+            lines.append(f"{name}_sum{_labels(labels)} {_format(value[-2])}")
+            lines.append(f"{name}_count{_labels(labels)} {value[-1]}")
+    return "\n".join(lines) + "\n"
@@ -1,30 +1,85 @@
 import os
 import io
 import json
-from fastapi import FastAPI, File, UploadFile, HTTPException
-from fastapi.responses import JSONResponse
+import time
+import asyncio
+import zipfile
+from functools import partial
+from typing import List
+from fastapi import FastAPI, File, Form, Query, Request, UploadFile, HTTPException
+from fastapi.responses import JSONResponse, PlainTextResponse
 import uvicorn
-import PyPDF2
-from openai import OpenAI
+import openai
 from dotenv import load_dotenv
 
-from jd_parser import jd_router
+from jd_parser import jd_router, parse_jd_profile, JD_SECTIONS
+from llm_client import PARSE_MODE, PARSE_MODES, call_function, call_functions_combined, token_usage
+import llm_cache
+import llm_client
+import llm_scheduler
+import llm_backends
+import token_budget
+import sap_vocab
+import deployment_rules
+import metrics
+import schema_validation
+from schema_validation import InvalidModelOutput
+from resume_sections import segment, text_for_phase
+from streaming import iter_sections, stream_response, check_format
+from token_budget import PromptTooLarge
+from batch_jobs import BatchQueue, BATCH_DB_PATH, BATCH_WORKERS, BATCH_MAX_DOCUMENT_BYTES, BATCH_MAX_UPLOAD_BYTES
+from text_extract import SUPPORTED_EXTENSIONS, extract_text_from_bytes, text_cache, shutdown_pool, PDFExtractionTimeout
 
 load_dotenv()
 
-# Load API key from environment
+# Load API key from environment (not needed with the offline fake backend)
 openai_api_key = os.getenv("OPENAI_API_KEY")
-if not openai_api_key:
+if not openai_api_key and llm_backends.LLM_BACKEND == "openai":
     raise RuntimeError("Please set the OPENAI_API_KEY environment variable.")
 
-# Initialize FastAPI and OpenAI client
+# Initialize FastAPI (the completion backend lives in llm_client)
 app = FastAPI()
-client = OpenAI(api_key=openai_api_key)
-MODEL = "gpt-4o-2024-08-06"
+
+@app.on_event("startup")
+async def start_batch_queue():
+    await batch_queue.start()
+
+@app.on_event("shutdown")
+async def stop_workers():
+    await batch_queue.stop()
+    shutdown_pool()
+    await llm_client.backend.aclose()
 
 # Mount JD parser routes under /parse/jd
 app.include_router(jd_router, prefix="/parse/jd")
 
+# Per-request metrics. The path is also the endpoint label for the spans and
+# token counts recorded while the request is served (the /parse routes have no
+# path parameters). Once routed, parameterised paths such as
+# /parse/batch/{job_id} are counted under their template and unknown paths as
+# "unmatched", so scanners cannot grow the series count.
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    path = request.url.path
+    token = metrics.current_endpoint.set(path)
+    metrics.inc("resumeparser_requests_in_flight")
+    began = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        if route is None:
+            endpoint = "unmatched"
+        else:
+            endpoint = route.path if request.scope.get("path_params") else path
+        metrics.observe("resumeparser_request_seconds", time.perf_counter() - began, endpoint=endpoint)
+        metrics.inc("resumeparser_requests_total", endpoint=endpoint, status=str(status))
+        metrics.dec("resumeparser_requests_in_flight")
+        metrics.current_endpoint.reset(token)
+
 json_schema_design = {
   "name": "parse_design_phase",
   "description": "Extract every field from a résumé's Design phase according to the schema",
@@ -556,70 +611,274 @@ Only use SAP-standard values for system types, deployment models, cloud platform
 """
 # Helper: extract text from txt or pdf
 async def extract_text(file: UploadFile) -> str:
-    content = await file.read()
-    if file.filename.lower().endswith(".pdf"):
-        reader = PyPDF2.PdfReader(io.BytesIO(content))
-        return "\n".join(page.extract_text() or "" for page in reader.pages)
-    else:
-        return content.decode("utf-8", errors="ignore")
+    with metrics.span("upload_read"):
+        content = await file.read()
+    try:
+        return await extract_text_from_bytes(file.filename, content)
+    except PDFExtractionTimeout as e:
+        raise HTTPException(400, f"File read error: {str(e)}")
 
 # Generic function to call OpenAI with a custom system prompt and JSON schema
-async def call_parser(text: str, system_prompt: str, function_schema: dict):
-    resp = client.chat.completions.create(
-        model=MODEL,
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": text}
-        ],
-        functions=[function_schema],
-        function_call={"name":function_schema["name"]}
-    )
-    print(f"Tokens used: {resp.usage.total_tokens}")
-    args = resp.choices[0].message.function_call.arguments
-    return json.loads(args)        
+# Model errors reach this point only after llm_scheduler has used up its retries
+async def call_parser(text: str, system_prompt: str, function_schema: dict, on_item=None):
+    try:
+        return await call_function(text, system_prompt, function_schema, on_item)
+    except PromptTooLarge as e:
+        raise HTTPException(413, str(e))
+    except InvalidModelOutput as e:
+        raise HTTPException(502, str(e))
+    except openai.RateLimitError:
+        raise HTTPException(429, "OpenAI rate limit exceeded, retry later", headers={"Retry-After": "30"})
+    except openai.APIError as e:
+        raise HTTPException(502, f"OpenAI API error: {str(e)}")
+    except json.JSONDecodeError:
+        raise HTTPException(500, "Failed to parse OpenAI response")
+    except ValueError as e:
+        raise HTTPException(500, f"Invalid OpenAI response: {str(e)}")
+
+# Phase name -> (system prompt, function schema), one entry per /parse/<phase> route
+RESUME_PHASES = {
+    "design": (SYSTEM_DESIGN_PROMPT, json_schema_design),
+    "build": (SYSTEM_BUILD_PROMPT, json_schema_build),
+    "integration": (SYSTEM_INTEGRATION_PROMPT, json_schema_integration),
+    "wricef": (SYSTEM_WRICEF_PROMPT, json_schema_wricef),
+    "integration_and_testing": (SYSTEM_INTTST_PROMPT, json_schema_inttst),
+    "module_and_tech_stack": (SYSTEM_MODULE_TECH_PROMPT, json_schema_module_tech),
+    "system_deployment_context": (SYSTEM_DEPLOYMENT_PROMPT, json_schema_deployment),
+}
+schema_validation.register(schema for _, schema in RESUME_PHASES.values())
+
+# Phases resolved by one combined completion ({} in split mode). If it
+# fails, every phase falls back to its own call.
+async def _combined_resume_phases(text: str, mode: str) -> dict:
+    if mode != "combined":
+        return {}
+    try:
+        return await call_functions_combined(text, RESUME_PHASES)
+    except Exception:
+        metrics.inc("resumeparser_combined_fallbacks_total", kind="resume")
+        return {}
+
+# Run every phase extraction concurrently over one extracted text.
+# In "combined" mode the phases are first packed into one completion; any
+# phase it does not return is extracted with its own call. Split calls only
+# receive the résumé sections their phase needs (segmented once here).
+async def parse_resume_profile(text: str, mode: str = PARSE_MODE) -> dict:
+    results = await _combined_resume_phases(text, mode)
+    remaining = [name for name in RESUME_PHASES if name not in results]
+    sections = segment(text)
+    outputs = await asyncio.gather(*(
+        call_parser(text_for_phase(text, name, sections), *RESUME_PHASES[name]) for name in remaining
+    ))
+    results.update(zip(remaining, outputs))
+    return {name: results[name] for name in RESUME_PHASES}
 
 @app.post('/parse/design')
 async def parse_design(file: UploadFile=File(...)):
   text= await extract_text(file)
-  parsed = await call_parser(text, SYSTEM_DESIGN_PROMPT, json_schema_design)   
+  parsed = await call_parser(text_for_phase(text, "design"), SYSTEM_DESIGN_PROMPT, json_schema_design)   
   return JSONResponse(content=parsed)   
 
 @app.post('/parse/build')
 async def parse_build(file: UploadFile=File(...)):
   text= await extract_text(file)
-  parsed = await call_parser(text, SYSTEM_BUILD_PROMPT, json_schema_build)   
+  parsed = await call_parser(text_for_phase(text, "build"), SYSTEM_BUILD_PROMPT, json_schema_build)   
   return JSONResponse(content=parsed)
 
 @app.post('/parse/integration')
 async def parse_integration(file: UploadFile=File(...)):
   text= await extract_text(file)
-  parsed = await call_parser(text, SYSTEM_INTEGRATION_PROMPT, json_schema_integration)   
+  parsed = await call_parser(text_for_phase(text, "integration"), SYSTEM_INTEGRATION_PROMPT, json_schema_integration)   
   return JSONResponse(content=parsed)
 
 @app.post('/parse/wricef')
 async def parse_wricef(file: UploadFile=File(...)):
   text= await extract_text(file)
-  parsed = await call_parser(text, SYSTEM_WRICEF_PROMPT, json_schema_wricef)   
+  parsed = await call_parser(text_for_phase(text, "wricef"), SYSTEM_WRICEF_PROMPT, json_schema_wricef)   
   return JSONResponse(content=parsed)
 
 @app.post('/parse/integration_and_testing')
 async def parse_integration_and_testing(file: UploadFile=File(...)):
   text= await extract_text(file)
-  parsed = await call_parser(text, SYSTEM_INTTST_PROMPT, json_schema_inttst)   
+  parsed = await call_parser(text_for_phase(text, "integration_and_testing"), SYSTEM_INTTST_PROMPT, json_schema_inttst)   
   return JSONResponse(content=parsed)  
 
 @app.post('/parse/module_and_tech_stack')  
 async def parse_module_and_tech_stack(file: UploadFile=File(...)):
   text= await extract_text(file)
-  parsed = await call_parser(text, SYSTEM_MODULE_TECH_PROMPT, json_schema_module_tech)   
+  parsed = await call_parser(text_for_phase(text, "module_and_tech_stack"), SYSTEM_MODULE_TECH_PROMPT, json_schema_module_tech)   
   return JSONResponse(content=parsed)
 
 @app.post('/parse/system_deployment_context')
 async def parse_system_deployment_context(file: UploadFile=File(...)):
   text= await extract_text(file)
-  parsed = await call_parser(text, SYSTEM_DEPLOYMENT_PROMPT, json_schema_deployment)   
+  parsed = await call_parser(text_for_phase(text, "system_deployment_context"), SYSTEM_DEPLOYMENT_PROMPT, json_schema_deployment)   
   return JSONResponse(content=parsed)  
 
+@app.post('/parse/resume/all')
+async def parse_resume_all(file: UploadFile=File(...), mode: str=PARSE_MODE):
+  if mode not in PARSE_MODES:
+    raise HTTPException(400, f"mode must be one of {', '.join(PARSE_MODES)}")
+  text= await extract_text(file)
+  parsed = await parse_resume_profile(text, mode)
+  return JSONResponse(content=parsed)
+
+# Same phases as /parse/resume/all, each streamed as soon as it is extracted (see streaming)
+@app.post('/parse/resume/stream')
+async def parse_resume_stream(file: UploadFile=File(...), mode: str=PARSE_MODE,
+                              stream_format: str=Query("sse", alias="format"), items: bool=True):
+  if mode not in PARSE_MODES:
+    raise HTTPException(400, f"mode must be one of {', '.join(PARSE_MODES)}")
+  check_format(stream_format)
+  text= await extract_text(file)
+
+  async def events():
+    ready = await _combined_resume_phases(text, mode)
+    sections = segment(text)
+    pending = {
+      name: partial(call_parser, text_for_phase(text, name, sections), *RESUME_PHASES[name])
+      for name in RESUME_PHASES if name not in ready
+    }
+    async for event in iter_sections(ready, pending, items):
+      yield event
+
+  return stream_response(events(), stream_format)
+
+# Batch ingestion: each document gets the full profile for its kind
+async def process_batch_document(kind: str, filename: str, content: bytes) -> dict:
+    llm_scheduler.current_lane.set("batch")  # batch workers yield to interactive requests
+    text = await extract_text_from_bytes(filename, content)
+    if not text.strip():
+        raise ValueError("Empty file content")
+    if kind == "jd":
+        return await parse_jd_profile(text)
+    return await parse_resume_profile(text)
+
+batch_queue = BatchQueue(BATCH_DB_PATH, BATCH_WORKERS, process_batch_document)
+
+# Expand .zip uploads into their member files. Files and members that are not
+# PDF or text are skipped; oversized members or archives are refused before
+# decompressing, and direct uploads get the same per-document and total caps.
+async def read_batch_documents(files: List[UploadFile]) -> list:
+    documents = []
+    total_bytes = 0  # direct files and uncompressed members, across the upload
+    for file in files:
+        content = await file.read()
+        if not file.filename.lower().endswith(".zip"):
+            if not file.filename.lower().endswith(SUPPORTED_EXTENSIONS):
+                continue
+            if len(content) > BATCH_MAX_DOCUMENT_BYTES:
+                raise HTTPException(413, f"{file.filename} is over {BATCH_MAX_DOCUMENT_BYTES} bytes")
+            total_bytes += len(content)
+            if total_bytes > BATCH_MAX_UPLOAD_BYTES:
+                raise HTTPException(413, f"Upload is over {BATCH_MAX_UPLOAD_BYTES} bytes")
+            documents.append((file.filename, content))
+            continue
+        try:
+            with zipfile.ZipFile(io.BytesIO(content)) as archive:
+                members = [
+                    member for member in archive.infolist()
+                    if not member.is_dir() and not member.filename.startswith("__MACOSX/")
+                    and member.filename.lower().endswith(SUPPORTED_EXTENSIONS)
+                ]
+                for member in members:
+                    if member.file_size > BATCH_MAX_DOCUMENT_BYTES:
+                        raise HTTPException(413, f"{member.filename} is over {BATCH_MAX_DOCUMENT_BYTES} bytes uncompressed")
+                if sum(member.file_size for member in members) > BATCH_MAX_UPLOAD_BYTES:
+                    raise HTTPException(413, f"{file.filename} is over {BATCH_MAX_UPLOAD_BYTES} bytes uncompressed")
+                total_bytes += sum(member.file_size for member in members)
+                if total_bytes > BATCH_MAX_UPLOAD_BYTES:
+                    raise HTTPException(413, f"Upload is over {BATCH_MAX_UPLOAD_BYTES} bytes")
+                for member in members:
+                    documents.append((os.path.basename(member.filename), archive.read(member)))
+        except zipfile.BadZipFile:
+            raise HTTPException(400, f"File read error: {file.filename} is not a valid zip archive")
+    return documents
+
+@app.post('/parse/batch')
+async def parse_batch(files: List[UploadFile]=File(...), kind: str=Form("resume")):
+  if kind not in ("resume", "jd"):
+    raise HTTPException(400, "kind must be 'resume' or 'jd'")
+  documents = await read_batch_documents(files)
+  if not documents:
+    raise HTTPException(400, "No documents in upload")
+  job_id = await batch_queue.submit(kind, documents)
+  return JSONResponse(content={"job_id": job_id, "documents": len(documents)}, status_code=202)
+
+@app.get('/parse/batch/{job_id}')
+async def get_batch(job_id: str):
+  status = await batch_queue.status(job_id)
+  if status is None:
+    raise HTTPException(404, "Unknown batch job")
+  return JSONResponse(content=status)
+
+# Pre-flight estimate: prompt tokens per phase, computed locally without calling the model
+@app.post('/parse/estimate')
+async def parse_estimate(file: UploadFile=File(...), kind: str="resume"):
+  if kind not in ("resume", "jd"):
+    raise HTTPException(400, "kind must be 'resume' or 'jd'")
+  text= await extract_text(file)
+  phases = RESUME_PHASES if kind == "resume" else JD_SECTIONS
+  sections = segment(text) if kind == "resume" else None
+  estimates = {}
+  for name, (prompt, schema) in phases.items():
+    phase_text = text_for_phase(text, name, sections) if kind == "resume" else text
+    tokens = token_budget.estimate_prompt_tokens(prompt, [schema], phase_text)
+    estimates[name] = {"prompt_tokens": tokens, "within_budget": tokens <= token_budget.MAX_PROMPT_TOKENS}
+  return JSONResponse(content={
+    "text_tokens": token_budget.count_tokens(text),
+    "max_prompt_tokens": token_budget.MAX_PROMPT_TOKENS,
+    "policy": token_budget.TOKEN_BUDGET_POLICY,
+    "phases": estimates,
+  })
+
+@app.get('/cache/stats')
+async def cache_stats():
+  llm_stats = llm_cache.cache.stats() if llm_cache.cache is not None else {"enabled": False}
+  return JSONResponse(content={"llm": llm_stats, "text": text_cache.stats()})
+
+# Hit/miss counters owned by the caches, read at scrape time
+def cache_metrics() -> list:
+  caches = {"text": text_cache.stats()}
+  if llm_cache.cache is not None:
+    caches["llm"] = llm_cache.cache.stats()
+  samples = []
+  for name, stats in caches.items():
+    samples.append(("resumeparser_cache_hits_total", {"cache": name}, stats["hits"]))
+    samples.append(("resumeparser_cache_misses_total", {"cache": name}, stats["misses"]))
+    samples.append(("resumeparser_cache_hit_ratio", {"cache": name}, stats["hit_ratio"]))
+  return samples
+
+metrics.collectors.append(cache_metrics)
+
+# Connection reuse of the model client (openai backend only)
+def http_pool_metrics() -> list:
+  if not hasattr(llm_client.backend, "stats"):
+    return []
+  stats = llm_client.backend.stats()
+  samples = [
+    ("resumeparser_llm_http_connections", {"state": "idle"}, stats["idle_connections"]),
+    ("resumeparser_llm_http_connections", {"state": "active"}, stats["active_connections"]),
+  ]
+  for name in ("requests", "tcp_connects", "tls_handshakes", "http2_requests"):
+    samples.append((f"resumeparser_llm_http_{name}_total", {}, stats[name]))
+  return samples
+
+metrics.collectors.append(http_pool_metrics)
+
+@app.get('/metrics')
+async def metrics_endpoint():
+  return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get('/pool/stats')
+async def pool_stats():
+  stats = llm_client.backend.stats() if hasattr(llm_client.backend, "stats") else {"enabled": False}
+  return JSONResponse(content=stats)
+
+@app.get('/usage')
+async def usage():
+  return JSONResponse(content={"tokens": token_usage, "prescreen": sap_vocab.stats, "deployment_rules": deployment_rules.stats})
+
 
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 8000))
@@ -0,0 +1,71 @@
+import os
+import re
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Heuristic résumé segmenter: split the text on recognisable section headings
+# once per document, so each phase prompt skips the sections it has no use for.
+# RESUME_SECTION_FILTER=0 sends the full text to every phase.
+RESUME_SECTION_FILTER = os.getenv("RESUME_SECTION_FILTER", "1") == "1"
+
+# Generic one-word headings ("Overview", "Profile", "Qualifications",
+# "Interests") are left out: they also head sub-sections inside a job entry.
+SECTION_HEADINGS = {
+    "summary": r"(?:professional |career |profile )summary|summary|career objective|about me",
+    "experience": r"(?:professional |work |relevant |sap |industry )?experience|employment(?: history)?|work history|career history",
+    "projects": r"(?:key |major |sap |recent )?projects?(?: experience| details| undertaken| handled)?|assignments",
+    "skills": r"(?:technical |key |core |sap |it )?skills(?: set| summary)?|core competencies|technical expertise|tools(?: and| &) technologies",
+    "education": r"education(?:al qualifications?| details)?|educational background|academics?(?: qualifications?| background| details)?",
+    "certifications": r"certifications?|certificates|trainings?(?: and| &) certifications?",
+    "personal": r"personal (?:details|information|profile)|languages known|hobbies(?: (?:and|&) interests)?|declaration|references",
+}
+
+_HEADING = re.compile(
+    r"^[\s\-•*#>\d.)]*(?:" + "|".join(
+        f"(?P<{name}>{pattern})" for name, pattern in SECTION_HEADINGS.items()
+    ) + r")\s*[:\-–]?\s*$",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+# Sections each résumé phase can do without. Everything else, including the
+# text before the first heading and anything under an unrecognised heading,
+# is always sent, so a missed or spurious heading never drops project text.
+PHASE_DROPPED_SECTIONS = {
+    "design": ("education", "certifications", "personal"),
+    "build": ("education", "certifications", "personal"),
+    "integration": ("education", "certifications", "personal"),
+    "wricef": ("education", "certifications", "personal"),
+    "integration_and_testing": ("education", "certifications", "personal"),
+    "module_and_tech_stack": ("education", "personal"),
+    "system_deployment_context": ("education", "certifications", "personal"),
+}
+
+
+# Return [(section name, text)] in document order. Headings longer than a
+# short line are ignored, so sentences that start with "Experience" stay put.
+def segment(text: str) -> list:
+    sections = []
+    start, name = 0, "header"
+    for match in _HEADING.finditer(text):
+        if len(match.group(0).strip()) > 60:
+            continue
+        sections.append((name, text[start:match.start()]))
+        name = match.lastgroup
+        start = match.end()
+    sections.append((name, text[start:]))
+    return [(name, body) for name, body in sections if body.strip()]
+
+
+# Text for one phase. Falls back to the full text when the résumé has no
+# recognisable structure or no experience/projects section was found.
+def text_for_phase(text: str, phase: str, sections: list = None) -> str:
+    if not RESUME_SECTION_FILTER or phase not in PHASE_DROPPED_SECTIONS:
+        return text
+    if sections is None:
+        sections = segment(text)
+    found = {name for name, _ in sections}
+    if len(found - {"header"}) < 2 or not found & {"experience", "projects"}:
+        return text
+    dropped = PHASE_DROPPED_SECTIONS[phase]
+    return "\n".join(body.strip("\n") for name, body in sections if name not in dropped)
@@ -0,0 +1,120 @@
+import os
+from collections import deque
+from functools import lru_cache
+from dotenv import load_dotenv
+
+from schema_tools import empty_result
+
+load_dotenv()
+
+# Deterministic pre-screen for phases that only make sense when the document
+# mentions specific SAP vocabulary. One Aho-Corasick pass finds every term
+# group present; a phase whose group has no hits gets an empty, schema-valid
+# result without calling the model. SAP_PRESCREEN=0 disables it.
+SAP_PRESCREEN = os.getenv("SAP_PRESCREEN", "1") == "1"
+
+# Terms come from the reference material in the SYSTEM_* prompts
+TERM_GROUPS = {
+    "integration": (
+        "integration", "integrated", "interface", "interfaces", "idoc", "idocs", "ale", "bapi", "bapis",
+        "rfc", "rfcs", "proxy", "proxies", "odata", "cpi", "sap cpi", "integration suite", "sap pi",
+        "sap po", "pi/po", "xi", "middleware", "mulesoft", "boomi", "edi", "web service", "web services",
+        "soap", "rest api", "rest apis", "api", "apis", "inbound", "outbound",
+    ),
+    "wricef": (
+        "wricef", "ricef", "ricefw", "frice", "abap", "alv", "sap query", "custom report", "custom reports",
+        "interface", "interfaces", "idoc", "idocs", "bapi", "bapis", "rfc", "proxy", "odata", "cpi",
+        "conversion", "conversions", "lsmw", "bdc", "migration cockpit", "ltmc", "data migration",
+        "enhancement", "enhancements", "badi", "badis", "user exit", "user exits", "customer exit",
+        "enhancement framework", "smartform", "smartforms", "smart forms", "adobe form", "adobe forms",
+        "sapscript", "output management", "workflow", "workflows", "brf+", "brfplus", "myinbox",
+    ),
+}
+
+# Function schema name -> term group it needs
+PRESCREEN_SCHEMAS = {
+    "parse_integration_experience": "integration",
+    "parse_integration_and_testing_experience": "integration",
+    "parse_wricef_development_experience": "wricef",
+    "parse_jd_integration_experience": "integration",
+    "parse_jd_integration_testing": "integration",
+    "parse_jd_wricef_requirements": "wricef",
+}
+
+stats = {"checked": 0, "skipped": 0}
+
+
+class KeywordAutomaton:
+    # Case-insensitive Aho-Corasick matcher over whole words/phrases.
+    # pairs is an iterable of (term, group); a term may belong to several groups.
+    def __init__(self, pairs):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [set()]
+        for term, group in pairs:
+            self._add(term.lower(), group)
+        self._build()
+
+    def _add(self, term: str, group: str):
+        state = 0
+        for char in term:
+            if char not in self._goto[state]:
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(set())
+                self._goto[state][char] = len(self._goto) - 1
+            state = self._goto[state][char]
+        self._out[state].add((len(term), group))
+
+    def _build(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._out[child] |= self._out[self._fail[child]]
+
+    # Groups with at least one match bounded by non-alphanumeric characters
+    def groups(self, text: str) -> set:
+        found = set()
+        text = text.lower()
+        state = 0
+        for end, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for length, group in self._out[state]:
+                if group in found:
+                    continue
+                start = end - length + 1
+                before = text[start - 1] if start > 0 else " "
+                after = text[end + 1] if end + 1 < len(text) else " "
+                if not before.isalnum() and not after.isalnum():
+                    found.add(group)
+        return found
+
+
+_automaton = KeywordAutomaton(
+    (term, group) for group, terms in TERM_GROUPS.items() for term in terms
+)
+
+
+@lru_cache(maxsize=256)
+def signal_groups(text: str) -> frozenset:
+    return frozenset(_automaton.groups(text))
+
+
+# Empty schema-valid result when the phase has no vocabulary signal, else None
+def prescreen(text: str, function_schema: dict):
+    group = PRESCREEN_SCHEMAS.get(function_schema["name"])
+    if not SAP_PRESCREEN or group is None:
+        return None
+    stats["checked"] += 1
+    if group in signal_groups(text):
+        return None
+    stats["skipped"] += 1
+    return empty_result(function_schema)
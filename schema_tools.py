@@ -0,0 +1,48 @@
+# Helpers that build JSON instances from the function schemas.
+
+
+# Smallest instance that still satisfies the schema: every declared property
+# present, arrays empty, strings blank, booleans false.
+def empty_instance(schema: dict):
+    kind = schema.get("type")
+    if kind == "object":
+        return {name: empty_instance(prop) for name, prop in schema.get("properties", {}).items()}
+    if kind == "array":
+        return []
+    if kind == "string":
+        return ""
+    if kind == "boolean":
+        return False
+    if kind in ("integer", "number"):
+        return 0
+    return None
+
+
+def empty_result(function_schema: dict) -> dict:
+    return empty_instance(function_schema["parameters"])
+
+
+# Plausible schema-conformant instance, used by the fake completion backend:
+# one item per array, enum members where declared, every declared property set.
+def sample_instance(schema: dict, name: str = "value"):
+    kind = schema.get("type")
+    if "enum" in schema:
+        return schema["enum"][0]
+    if kind == "object":
+        properties = schema.get("properties")
+        if properties is None and isinstance(schema.get("additionalProperties"), dict):
+            return {f"sample_{name}": sample_instance(schema["additionalProperties"], name)}
+        return {prop_name: sample_instance(prop, prop_name) for prop_name, prop in (properties or {}).items()}
+    if kind == "array":
+        return [sample_instance(schema.get("items", {"type": "string"}), name)]
+    if kind == "string":
+        return f"sample_{name}".lower()
+    if kind == "boolean":
+        return True
+    if kind in ("integer", "number"):
+        return 1
+    return None
+
+
+def sample_result(function_schema: dict) -> dict:
+    return sample_instance(function_schema["parameters"])
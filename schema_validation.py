@@ -0,0 +1,112 @@
+import metrics
+
+# Validators for model output, compiled once per function schema. Compiling
+# turns the schema into nested closures, so a check walks the result without
+# re-reading the schema. Covers the keywords the parser schemas use: type,
+# enum, properties, required, additionalProperties and items.
+
+# Stop collecting after this many errors; they only feed the repair prompt
+MAX_ERRORS = 20
+
+_TYPES = {
+    "object": lambda value: isinstance(value, dict),
+    "array": lambda value: isinstance(value, list),
+    "string": lambda value: isinstance(value, str),
+    "boolean": lambda value: isinstance(value, bool),
+    "integer": lambda value: isinstance(value, int) and not isinstance(value, bool),
+    "number": lambda value: isinstance(value, (int, float)) and not isinstance(value, bool),
+    "null": lambda value: value is None,
+}
+
+
+class InvalidModelOutput(ValueError):
+    def __init__(self, function_name: str, errors: list):
+        self.function_name = function_name
+        self.errors = errors
+        super().__init__(f"{function_name} output does not match its schema: {'; '.join(errors[:5])}")
+
+
+def _compile(schema: dict):
+    checks = []
+
+    kinds = schema.get("type")
+    if kinds is not None:
+        kinds = [kinds] if isinstance(kinds, str) else list(kinds)
+        tests = [_TYPES[kind] for kind in kinds]
+        expected = " or ".join(kinds)
+
+        def check_type(value, path, errors):
+            if not any(test(value) for test in tests):
+                errors.append(f"{path or '/'}: expected {expected}, got {type(value).__name__}")
+                return False
+            return True
+        checks.append(check_type)
+
+    if "enum" in schema:
+        allowed = list(schema["enum"])
+
+        def check_enum(value, path, errors):
+            if value not in allowed:
+                errors.append(f"{path or '/'}: {value!r} is not one of {allowed}")
+            return True
+        checks.append(check_enum)
+
+    properties = {name: _compile(prop) for name, prop in schema.get("properties", {}).items()}
+    required = list(schema.get("required", ()))
+    additional = schema.get("additionalProperties", True)
+    extra = _compile(additional) if isinstance(additional, dict) else None
+    if properties or required or additional is not True:
+        def check_object(value, path, errors):
+            if not isinstance(value, dict):
+                return True
+            for name in required:
+                if name not in value:
+                    errors.append(f"{path}/{name}: required property missing")
+            for name, member in value.items():
+                check = properties.get(name, extra)
+                if check is not None:
+                    check(member, f"{path}/{name}", errors)
+                elif additional is False:
+                    errors.append(f"{path}/{name}: unexpected property")
+            return True
+        checks.append(check_object)
+
+    if "items" in schema:
+        item_check = _compile(schema["items"])
+
+        def check_items(value, path, errors):
+            if isinstance(value, list):
+                for index, item in enumerate(value):
+                    if len(errors) >= MAX_ERRORS:
+                        break
+                    item_check(item, f"{path}/{index}", errors)
+            return True
+        checks.append(check_items)
+
+    def check(value, path, errors):
+        for step in checks:
+            if len(errors) >= MAX_ERRORS or not step(value, path, errors):
+                return
+    return check
+
+
+# Function name -> compiled validator for its parameters
+validators = {}
+
+
+def register(function_schemas):
+    for function_schema in function_schemas:
+        validators[function_schema["name"]] = _compile(function_schema["parameters"])
+
+
+# Errors for result against the function's parameters schema ([] = valid),
+# timed as the "validate" stage of the current endpoint
+def validate(function_schema: dict, result) -> list:
+    check = validators.get(function_schema["name"])
+    if check is None:
+        register([function_schema])
+        check = validators[function_schema["name"]]
+    errors = []
+    with metrics.span("validate"):
+        check(result, "", errors)
+    return errors
@@ -0,0 +1,88 @@
+import json
+import asyncio
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+
+# Streaming variants of the multi-section parses: each section is sent the
+# moment its extraction finishes instead of after the slowest one.
+# Every event is one JSON object:
+#   {"section": name, "path": "primary_modules/0", "item": {...}}   (items=true)
+#   {"section": name, "result": {...}}
+#   {"section": name, "error": detail, "status": http status}
+#   {"done": true, "sections": n, "errors": n}   (always last)
+# Item events are previews of array items taken from the streamed completion
+# while it is still being generated; the section's result event is
+# authoritative. Framed as server-sent events (format=sse) or one object per
+# line (format=ndjson).
+STREAM_FORMATS = {"sse": "text/event-stream", "ndjson": "application/x-ndjson"}
+
+
+async def _outcome(name: str, awaitable):
+    try:
+        return {"section": name, "result": await awaitable}
+    except HTTPException as e:
+        return {"section": name, "error": e.detail, "status": e.status_code}
+    except Exception as e:
+        return {"section": name, "error": str(e), "status": 500}
+
+
+# ready: sections already resolved (combined mode); pending: name -> start,
+# where start(on_item) returns the awaitable extracting that section and
+# on_item is None when items=False. Unfinished extractions are cancelled if
+# the client goes away mid-stream; a completion shared with another request
+# (llm_client coalescing) keeps running until that request is done with it.
+async def iter_sections(ready: dict, pending: dict, items: bool = True):
+    events = asyncio.Queue()
+
+    def item_sink(name: str):
+        def on_item(path: tuple, item):
+            events.put_nowait({"section": name, "path": "/".join(str(part) for part in path), "item": item})
+        return on_item if items else None
+
+    async def run(name: str, start):
+        events.put_nowait(await _outcome(name, start(item_sink(name))))
+
+    errors = 0
+    tasks = [asyncio.ensure_future(run(name, start)) for name, start in pending.items()]
+    try:
+        for name, result in ready.items():
+            yield {"section": name, "result": result}
+        remaining = len(tasks)
+        while remaining:
+            event = await events.get()
+            if "item" not in event:
+                remaining -= 1
+                errors += "error" in event
+            yield event
+    finally:
+        for task in tasks:
+            task.cancel()
+    yield {"done": True, "sections": len(ready) + len(pending), "errors": errors}
+
+
+def _frame(event: dict, stream_format: str) -> str:
+    data = json.dumps(event, ensure_ascii=False)
+    if stream_format == "ndjson":
+        return data + "\n"
+    if event.get("done"):
+        kind = "done"
+    else:
+        kind = "error" if "error" in event else ("item" if "item" in event else "section")
+    return f"event: {kind}\ndata: {data}\n\n"
+
+
+def check_format(stream_format: str):
+    if stream_format not in STREAM_FORMATS:
+        raise HTTPException(400, f"format must be one of {', '.join(STREAM_FORMATS)}")
+
+
+def stream_response(events, stream_format: str) -> StreamingResponse:
+    async def body():
+        async for event in events:
+            yield _frame(event, stream_format)
+
+    return StreamingResponse(
+        body(),
+        media_type=STREAM_FORMATS[stream_format],
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
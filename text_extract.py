@@ -0,0 +1,321 @@
+import os
+import io
+import time
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import PyPDF2
+from dotenv import load_dotenv
+
+import metrics
+
+load_dotenv()
+
+# Extracted PDF text is cached by SHA-256 of the upload bytes, so the same
+# document sent to several /parse/* endpoints is decoded only once.
+TEXT_CACHE_MAX_ENTRIES = int(os.getenv("TEXT_CACHE_MAX_ENTRIES", "256"))
+TEXT_CACHE_DIR = os.getenv("TEXT_CACHE_DIR", "")  # optional disk tier
+
+# PDF decoding is CPU-bound, so it runs in a bounded process pool instead of
+# on the event loop. PDF_WORKERS=0 decodes inline.
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(os.cpu_count() or 1)))
+PDF_TIMEOUT = float(os.getenv("PDF_TIMEOUT", "30"))  # seconds per document
+
+# Pages are decoded in parallel chunks of PDF_PAGES_PER_TASK and streamed back
+# in order; decoding stops once PDF_MAX_CHARS characters are collected.
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "8"))
+PDF_MAX_CHARS = int(os.getenv("PDF_MAX_CHARS", "0"))  # 0 = no limit
+
+# Page-text backend: pypdf2 (default), or pypdf / pymupdf / pdfminer when installed
+PDF_EXTRACTOR = os.getenv("PDF_EXTRACTOR", "pypdf2")
+
+# Document types extract_text_from_bytes reads (anything else would be decoded
+# as UTF-8 junk); used to pick files out of directories and zip uploads
+SUPPORTED_EXTENSIONS = (".pdf", ".txt")
+
+
+class PDFExtractionTimeout(Exception):
+    pass
+
+
+@dataclass
+class PDFExtraction:
+    text: str
+    page_timings: list = field(default_factory=list)  # seconds per decoded page
+    truncated: bool = False
+
+    @property
+    def pages_read(self) -> int:
+        return len(self.page_timings)
+
+
+class TextCache:
+    # In-memory LRU tier with an optional on-disk tier (one file per hash)
+    def __init__(self, max_entries: int, directory: str = ""):
+        self.max_entries = max_entries
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.txt")
+
+    def get(self, key: str):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+        if self.directory and os.path.exists(self._path(key)):
+            with open(self._path(key), encoding="utf-8") as f:
+                text = f.read()
+            self._remember(key, text)
+            with self._lock:
+                self.hits += 1
+            return text
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key: str, text: str):
+        self._remember(key, text)
+        if self.directory:
+            tmp_path = f"{self._path(key)}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp_path, self._path(key))
+
+    def _remember(self, key: str, text: str):
+        with self._lock:
+            self._entries[key] = text
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._entries),
+        }
+
+
+text_cache = TextCache(TEXT_CACHE_MAX_ENTRIES, TEXT_CACHE_DIR)
+
+
+_pool = None
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is not None and _pool._broken:
+        # A worker died (e.g. OOM on a hostile PDF); start a fresh pool
+        shutdown_pool()
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=PDF_WORKERS)
+    return _pool
+
+
+def shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+# shutdown() lets running tasks finish, so a page stuck decoding would keep its
+# worker busy for every later upload; kill the workers and start a fresh pool
+def _reset_pool(pool: ProcessPoolExecutor):
+    global _pool
+    if pool is None or pool is not _pool:
+        return  # decoding inline, or already replaced
+    _pool = None
+    # Terminating first fails queued chunks with BrokenProcessPool (which
+    # extract_pdf_document retries) instead of cancelling them
+    for process in list((pool._processes or {}).values()):
+        process.terminate()
+    pool.shutdown(wait=False)
+
+
+# Each extractor opens a document from bytes and returns (page count, page -> text).
+# Imports are local so the optional backends are only needed when selected.
+def _open_pypdf2(content: bytes):
+    reader = PyPDF2.PdfReader(io.BytesIO(content))
+    return len(reader.pages), lambda index: reader.pages[index].extract_text() or ""
+
+
+def _open_pypdf(content: bytes):
+    import pypdf
+    reader = pypdf.PdfReader(io.BytesIO(content))
+    return len(reader.pages), lambda index: reader.pages[index].extract_text() or ""
+
+
+def _open_pymupdf(content: bytes):
+    import fitz
+    document = fitz.open(stream=content, filetype="pdf")
+    return document.page_count, lambda index: document[index].get_text()
+
+
+def _open_pdfminer(content: bytes):
+    from pdfminer.high_level import extract_text
+    from pdfminer.pdfpage import PDFPage
+    page_count = sum(1 for _ in PDFPage.get_pages(io.BytesIO(content)))
+    return page_count, lambda index: extract_text(io.BytesIO(content), page_numbers=[index])
+
+
+PDF_EXTRACTORS = {
+    "pypdf2": _open_pypdf2,
+    "pypdf": _open_pypdf,
+    "pymupdf": _open_pymupdf,
+    "pdfminer": _open_pdfminer,
+}
+
+
+if PDF_EXTRACTOR not in PDF_EXTRACTORS:
+    raise RuntimeError(f"Unknown PDF_EXTRACTOR {PDF_EXTRACTOR!r}; expected one of {', '.join(PDF_EXTRACTORS)}")
+
+
+def _open(content: bytes, extractor: str):
+    if extractor not in PDF_EXTRACTORS:
+        raise ValueError(f"Unknown PDF extractor {extractor!r}; expected one of {', '.join(PDF_EXTRACTORS)}")
+    return PDF_EXTRACTORS[extractor](content)
+
+
+# Each process keeps the document it opened last, so consecutive chunks of one
+# document landing on the same worker parse it once
+_opened = {}
+
+
+def _open_cached(key: str, content: bytes, extractor: str):
+    if (key, extractor) not in _opened:
+        _opened.clear()
+        _opened[key, extractor] = _open(content, extractor)
+    return _opened[key, extractor]
+
+
+# Returns (page count, [(text, seconds)] for pages start..stop), so the first
+# chunk also sizes the document without a separate pass over it
+def _decode_page_range(key: str, content: bytes, start: int, stop: int, extractor: str) -> tuple:
+    page_count, page_text = _open_cached(key, content, extractor)
+    pages = []
+    for index in range(start, min(stop, page_count)):
+        began = time.perf_counter()
+        text = page_text(index)
+        pages.append((text, time.perf_counter() - began))
+    return page_count, pages
+
+
+def _start_chunk(pool: ProcessPoolExecutor, *args) -> Future:
+    if pool is None:
+        chunk = Future()
+        try:
+            chunk.set_result(_decode_page_range(*args))
+        except Exception as e:
+            chunk.set_exception(e)
+        return chunk
+    if pool is not _pool:
+        raise BrokenProcessPool("PDF pool was reset")
+    return pool.submit(_decode_page_range, *args)
+
+
+# A chunk cannot be cancelled once a worker has started it; if any chunk of an
+# abandoned document is still decoding at the document's deadline, the pool is
+# killed so that document cannot pin a worker
+def _reap(pool: ProcessPoolExecutor, chunks: list):
+    if any(not chunk.done() for chunk in chunks):
+        _reset_pool(pool)
+
+
+# Yield (text, seconds) per page in page order. At most PDF_WORKERS chunks are
+# in flight, so a consumer that stops early leaves the tail undecoded.
+async def iter_pdf_pages(content: bytes, extractor: str = None):
+    extractor = extractor or PDF_EXTRACTOR
+    key = hashlib.sha256(content).hexdigest()
+    step = max(PDF_PAGES_PER_TASK, 1)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + PDF_TIMEOUT
+    pool = _get_pool() if PDF_WORKERS > 0 else None
+    in_flight = deque([_start_chunk(pool, key, content, 0, step, extractor)])
+    try:
+        page_count, pages = await asyncio.wrap_future(in_flight[0])
+        in_flight.popleft()
+        ranges = deque((start, start + step) for start in range(step, page_count, step))
+        while True:
+            while ranges and len(in_flight) < max(PDF_WORKERS, 1):
+                in_flight.append(_start_chunk(pool, key, content, *ranges.popleft(), extractor))
+            for page in pages:
+                yield page
+            if not in_flight:
+                return
+            _, pages = await asyncio.wrap_future(in_flight[0])
+            in_flight.popleft()
+    finally:
+        for chunk in in_flight:
+            chunk.cancel()
+        running = [chunk for chunk in in_flight if not chunk.done()]
+        if running:
+            loop.call_later(max(deadline - loop.time(), 0), _reap, pool, running)
+
+
+async def _collect_pages(content: bytes, extractor: str) -> PDFExtraction:
+    texts, timings, chars, truncated = [], [], 0, False
+    pages = iter_pdf_pages(content, extractor)
+    try:
+        async for text, seconds in pages:
+            timings.append(seconds)
+            if PDF_MAX_CHARS and chars + len(text) > PDF_MAX_CHARS:
+                texts.append(text[:PDF_MAX_CHARS - chars])
+                truncated = True
+                break
+            texts.append(text)
+            chars += len(text) + 1
+    finally:
+        await pages.aclose()
+    return PDFExtraction("\n".join(texts), timings, truncated)
+
+
+async def extract_pdf_document(content: bytes, extractor: str = None) -> PDFExtraction:
+    for attempt in range(2):
+        try:
+            return await asyncio.wait_for(_collect_pages(content, extractor or PDF_EXTRACTOR), PDF_TIMEOUT)
+        except asyncio.TimeoutError:
+            # iter_pdf_pages kills the pool if a chunk is still decoding
+            raise PDFExtractionTimeout(f"PDF extraction exceeded {PDF_TIMEOUT:g}s")
+        except BrokenProcessPool:
+            # A worker died, or the pool was reset for another document's
+            # timeout; retry once on a fresh pool
+            if attempt:
+                raise
+
+
+async def extract_pdf_text(content: bytes) -> str:
+    # Keyed per extractor too, so switching backends never serves stale text
+    key = f"{hashlib.sha256(content).hexdigest()}-{PDF_EXTRACTOR}"
+    text = text_cache.get(key)
+    if text is None:
+        document = await extract_pdf_document(content)
+        for seconds in document.page_timings:
+            metrics.observe("resumeparser_pdf_page_seconds", seconds, extractor=PDF_EXTRACTOR)
+        if document.truncated:
+            metrics.inc("resumeparser_pdf_truncated_total", extractor=PDF_EXTRACTOR)
+        text = document.text
+        text_cache.set(key, text)
+    return text
+
+
+# Shared by both parsers: PDFs go through the cache, anything else is read as UTF-8
+async def extract_text_from_bytes(filename: str, content: bytes) -> str:
+    with metrics.span("text_extract"):
+        if filename.lower().endswith(".pdf"):
+            return await extract_pdf_text(content)
+        return content.decode("utf-8", errors="ignore")
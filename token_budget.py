@@ -0,0 +1,81 @@
+import os
+import json
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Local prompt-size estimation, so oversized inputs are refused (or cut down)
+# before a slow remote round-trip instead of failing after it.
+MAX_PROMPT_TOKENS = int(os.getenv("MAX_PROMPT_TOKENS", "100000"))
+TOKEN_BUDGET_POLICY = os.getenv("TOKEN_BUDGET_POLICY", "reject")  # "reject" or "truncate"
+MESSAGE_OVERHEAD_TOKENS = 12  # role markers and function-call framing per request
+
+try:
+    import tiktoken
+except ImportError:  # optional: fall back to a character heuristic
+    tiktoken = None
+
+_encoding = None
+_encoding_loaded = False
+
+
+def _get_encoding(model: str = "gpt-4o"):
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        _encoding_loaded = True
+        if tiktoken is not None:
+            try:
+                _encoding = tiktoken.encoding_for_model(model)
+            except Exception:
+                # Unknown model or the BPE file can't be fetched (offline hosts)
+                try:
+                    _encoding = tiktoken.get_encoding("o200k_base")
+                except Exception:
+                    _encoding = None
+    return _encoding
+
+
+class PromptTooLarge(Exception):
+    def __init__(self, estimated: int, limit: int):
+        self.estimated = estimated
+        self.limit = limit
+        super().__init__(f"Prompt is about {estimated} tokens, over the {limit} token budget")
+
+
+def count_tokens(text: str) -> int:
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return len(text) // 4 + 1
+
+
+def estimate_prompt_tokens(system_prompt: str, function_schemas: list, text: str) -> int:
+    return (
+        count_tokens(system_prompt)
+        + count_tokens(json.dumps(function_schemas))
+        + count_tokens(text)
+        + MESSAGE_OVERHEAD_TOKENS
+    )
+
+
+def _truncate(text: str, max_tokens: int) -> str:
+    if max_tokens <= 0:
+        return ""
+    encoding = _get_encoding()
+    if encoding is not None:
+        return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens])
+    return text[:max_tokens * 4]
+
+
+# Return the text to send for this (prompt, schema), applying TOKEN_BUDGET_POLICY
+# when the estimate exceeds MAX_PROMPT_TOKENS.
+def fit_text(system_prompt: str, function_schema: dict, text: str) -> str:
+    estimated = estimate_prompt_tokens(system_prompt, [function_schema], text)
+    if estimated <= MAX_PROMPT_TOKENS:
+        return text
+    if TOKEN_BUDGET_POLICY != "truncate":
+        raise PromptTooLarge(estimated, MAX_PROMPT_TOKENS)
+    fixed = estimated - count_tokens(text)
+    if fixed >= MAX_PROMPT_TOKENS:
+        raise PromptTooLarge(estimated, MAX_PROMPT_TOKENS)
+    return _truncate(text, MAX_PROMPT_TOKENS - fixed)